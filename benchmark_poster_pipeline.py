@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import poster_generator as pg
+
+SURFACES = ['Tarmac (New)', 'Gravel (Normal)', 'Snow (Worn)', 'Tarmac (Worn)']
+WEATHERS = ['Dry Morning Clear', 'Damp Noon PartCloud', 'Wet Evening LightRain', 'Dry Noon HeavyFog', 'Wet Morning HeavySnow']
+SKILLS = ['Inexperienced', 'Proficient', 'Competent', 'Skilled', 'Expert']
+
+def synthetic_rally_html(legs, stages_per_leg=5, rally_name="DE-DCR Benchmark Rally"):
+    # Mimics the rally description page: a td.szdb content cell holding the info table
+    # (tr.fejlec, distance, car groups) and the stage table with lista_kiemelt leg headers,
+    # stage rows, road side service rows and tr.servicepark rows. Returned as latin-1 bytes.
+    rows = ['<tr class="fejlec2"><td>SS</td><td>Stage name</td><td>Distance</td><td>Surface</td><td>Weather</td></tr>']
+    stage_number = 1
+    for leg in range(1, legs + 1):
+        rows.append(f'<tr><td class="lista_kiemelt"><b>Leg {leg}</b></td><td class="lista_kiemelt"></td>'
+                    f'<td class="lista_kiemelt"><b>{stages_per_leg * 12.4:.2f} km</b></td></tr>')
+        for stage in range(stages_per_leg):
+            surface = SURFACES[stage_number % len(SURFACES)]
+            weather = WEATHERS[stage_number % len(WEATHERS)]
+            rows.append(f'<tr class="lista{stage_number % 2}"><td>{stage_number}</td>'
+                        f'<td><div class="stagename">Stage {stage_number}\r\n Col de Turini</div><span>Monte Carlo</span></td>'
+                        f'<td>{10 + stage % 7}.{stage_number % 10}0 km</td><td>{surface}</td><td>{weather}</td></tr>')
+            if stage < stages_per_leg - 1:
+                rows.append('<tr class="lista"><td></td><td>Road Side Service - 5 minutes</td><td></td><td></td><td></td></tr>')
+            stage_number += 1
+        skill = SKILLS[leg % len(SKILLS)]
+        rows.append(f'<tr class="servicepark"><td></td><td>Service Park-60 minutes - 4 {skill} mechanic</td><td colspan="3"></td></tr>')
+
+    navigation = ''.join(f'<tr><td class="menu"><a href="/rally/{n}">Rally {n}</a></td></tr>' for n in range(50))
+    html = f'''<!DOCTYPE html>
+<html><head><meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1"><title>RSF</title></head>
+<body><table class="keret"><tr><td class="menu_col"><table>{navigation}</table></td>
+<td class="szdb" style="padding:5px; vertical-align:top">
+<table class="rally_info"><tr class="fejlec"><td colspan="2"><b>{rally_name}</b></td></tr>
+<tr><td>Total Distance Rally:</td><td>{legs * stages_per_leg * 12.4:.2f} km</td></tr>
+<tr><td>Car Groups:</td><td>Group A8, Rally2, Rally3, Gr. N4 &amp; WRC 2.0</td></tr>
+<tr><td>Start:</td><td>2026-10-01 00:00</td></tr></table>
+<table class="stages">{''.join(rows)}</table>
+</td></tr></table><div class="footer">RallySimFans</div></body></html>'''
+    return html.encode('latin-1')
+
+
+def measure(function, repeat, track_memory=True):
+    # Best and median wall time over `repeat` runs; peak Python heap of one extra run
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    peak_kb = None
+    if track_memory:
+        tracemalloc.start()
+        try:
+            function()
+            peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return {
+        "best_ms": min(timings) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "peak_kb": peak_kb,
+    }, result
+
+
+def _texts_to_translate(poster_data):
+    texts = []
+    for leg in poster_data['legs']:
+        for item in leg['items']:
+            if item['type'] == 'stage':
+                texts.extend((item['surface'], item['weather']))
+            else:
+                texts.append(item['cleaned_text'])
+    return texts
+
+
+def benchmark_scale(legs, stages_per_leg, repeat, renderer=None):
+    quiet = lambda message: None
+    html_content = synthetic_rally_html(legs, stages_per_leg)
+    phases = {}
+
+    phases["parse"], (poster_data, error) = measure(lambda: pg.generate_poster_data(html_content, False, quiet), repeat)
+    if error:
+        raise RuntimeError(error)
+    phases["parse_soup"], _ = measure(lambda: pg.generate_poster_data(html_content, False, quiet, parser='soup'), repeat)
+
+    texts = _texts_to_translate(poster_data)
+    def translate_all():
+        translator = pg.CompiledTranslator(pg.translations) # Cold: includes compiling the dictionary
+        return [translator(text) for text in texts]
+    phases["translate"], _ = measure(translate_all, repeat)
+
+    translated_data, _ = pg.generate_poster_data(html_content, True, quiet)
+    phases["build_html"], poster_html = measure(lambda: pg.build_poster_html(translated_data, True), repeat)
+
+    if _has_pillow():
+        phases["raster_render"], _ = measure(lambda: pg.render_raster_png(translated_data, True), repeat, track_memory=False)
+
+    png_bytes = None
+    if renderer is not None:
+        # Launch is measured once per scale on a fresh browser, screenshots on the warm one
+        renderer.close()
+        started = time.perf_counter()
+        renderer.run(lambda browser: _noop(), quiet)
+        phases["browser_launch"] = {"best_ms": (time.perf_counter() - started) * 1000, "median_ms": None, "peak_kb": None}
+        phases["screenshot"], png_bytes = measure(lambda: renderer.render_html(poster_html, quiet), repeat, track_memory=False)
+
+    return {
+        "legs": legs,
+        "stages_per_leg": stages_per_leg,
+        "stages": legs * stages_per_leg,
+        "html_bytes": len(html_content),
+        "poster_html_bytes": len(poster_html.encode('utf-8')),
+        "png_bytes": len(png_bytes) if png_bytes is not None else None,
+        "phases": phases,
+    }
+
+async def _noop():
+    return None
+
+def _has_pillow():
+    try:
+        import PIL
+    except ImportError:
+        return False
+    import raster_renderer
+    return raster_renderer.pillow_supported()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark der Poster-Pipeline mit synthetischen Rallye-Seiten.")
+    parser.add_argument("--legs", default="1,10,50,100,500", help="Kommagetrennte Anzahl Etappen (Standard: 1,10,50,100,500)")
+    parser.add_argument("--stages-per-leg", type=int, default=5, help="Wertungsprüfungen pro Etappe (Standard: 5)")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen pro Phase (Standard: 3)")
+    parser.add_argument("--no-browser", action="store_true", help="Browser-Start und Screenshot nicht messen")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="Ergebnisdatei (JSON)")
+    args = parser.parse_args(argv)
+
+    scales = [int(value) for value in args.legs.split(',') if value.strip()]
+    renderer = None if args.no_browser else pg.PosterRenderer()
+    results = []
+    try:
+        for legs in scales:
+            result = benchmark_scale(legs, args.stages_per_leg, max(1, args.repeat), renderer)
+            results.append(result)
+            summary = ", ".join(f"{name} {phase['best_ms']:.1f} ms" for name, phase in result["phases"].items())
+            print(f"{legs:>4} Etappen / {result['stages']:>5} WPs: {summary}")
+    finally:
+        if renderer is not None:
+            renderer.close()
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Ergebnisse gespeichert: {os.path.abspath(args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
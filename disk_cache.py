@@ -0,0 +1,316 @@
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Override with RSF_POSTER_CACHE_DIR, e.g. to keep the cache next to a portable executable
+DEFAULT_CACHE_DIR = os.environ.get('RSF_POSTER_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.rsf_poster_cache')
+
+# status: 'fresh' (within TTL, no request), 'revalidated' (304), 'downloaded',
+# 'offline' (cache only) or 'stale' (network or HTTP error, served old copy)
+CachedPage = collections.namedtuple('CachedPage', 'url content status')
+
+
+class CacheMissError(requests.exceptions.RequestException):
+    pass
+
+
+def cache_key(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def touch(path):
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass # Entry was evicted meanwhile
+
+def evict_lru(directory, max_bytes):
+    # Files sharing a key prefix ("<key>.json", "<key>.body", ...) form one entry; the newest
+    # mtime of an entry is its last use. Oldest entries go first until we fit into max_bytes.
+    entries = {}
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    for name in names:
+        if name.endswith('.tmp'):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        key = name.split('.', 1)[0]
+        size, last_used, paths = entries.get(key, (0, 0.0, []))
+        entries[key] = (size + stat.st_size, max(last_used, stat.st_mtime), paths + [path])
+
+    total = sum(size for size, _, _ in entries.values())
+    removed = 0
+    for key, (size, _, paths) in sorted(entries.items(), key=lambda entry: entry[1][1]):
+        if total <= max_bytes:
+            break
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def create_session(pool_size=8):
+    # One keep-alive connection pool shared by all downloads
+    session = requests.Session()
+    session.headers['User-Agent'] = 'Mozilla/5.0'
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class HttpCache:
+    # Disk cache for rally pages keyed by URL. Bodies are stored together with their
+    # ETag/Last-Modified; within `ttl` seconds a page is served without any request,
+    # afterwards it is revalidated with a conditional GET.
+
+    def __init__(self, cache_dir=None, ttl=3600, max_bytes=50 * 1024 * 1024, offline=False, session=None, timeout=15):
+        self.directory = os.path.join(cache_dir or DEFAULT_CACHE_DIR, 'http')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.timeout = timeout
+        self.session = session or create_session()
+        self._evict_lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        key = cache_key(url)
+        meta_path = os.path.join(self.directory, key + '.json')
+        body_path = os.path.join(self.directory, key + '.body')
+        meta, body = self._load(meta_path, body_path)
+
+        if self.offline:
+            if meta is None:
+                raise CacheMissError(f"Offline-Modus: {url} ist nicht im Cache.")
+            touch(meta_path)
+            return CachedPage(url, body, 'offline')
+
+        if meta is not None and time.time() - meta['fetched_at'] < self.ttl:
+            touch(meta_path)
+            return CachedPage(url, body, 'fresh')
+
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+        except requests.exceptions.RequestException:
+            if meta is None:
+                raise
+            return CachedPage(url, body, 'stale') # Better an old page than none
+
+        if response.status_code == 304 and meta is not None:
+            meta['fetched_at'] = time.time()
+            write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+            return CachedPage(url, body, 'revalidated')
+
+        if response.status_code >= 400 and meta is not None:
+            return CachedPage(url, body, 'stale') # HTTP error, e.g. a 503 during maintenance
+        response.raise_for_status()
+        self._store(url, response, meta_path, body_path)
+        return CachedPage(url, response.content, 'downloaded')
+
+    def clear(self):
+        evict_lru(self.directory, 0)
+
+    def _load(self, meta_path, body_path):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None # Missing or half-written entry counts as a miss
+        return meta, body
+
+    def _store(self, url, response, meta_path, body_path):
+        if 'no-store' in response.headers.get('Cache-Control', ''):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        meta = {
+            "url": url,
+            "etag": response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified'),
+            "fetched_at": time.time(),
+            "size": len(response.content),
+        }
+        write_atomic(body_path, response.content)
+        write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        with self._evict_lock:
+            evict_lru(self.directory, self.max_bytes)
+
+
+class RenderCache:
+    # Content-addressed store for rendered posters: the key is a hash over everything that
+    # influences the image, so a hit can be returned without touching the browser.
+    # max_bytes=0 disables the cache.
+
+    def __init__(self, cache_dir=None, max_bytes=200 * 1024 * 1024):
+        self.directory = os.path.join(cache_dir or DEFAULT_CACHE_DIR, 'renders')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts):
+        encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        # Returns (png_bytes, poster_html) or None
+        if self.max_bytes <= 0:
+            return None
+        png_path = os.path.join(self.directory, key + '.png')
+        try:
+            with open(png_path, "rb") as f:
+                png_bytes = f.read()
+            with open(os.path.join(self.directory, key + '.html'), "r", encoding="utf-8") as f:
+                poster_html = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        touch(png_path)
+        with self._lock:
+            self.hits += 1
+        return png_bytes, poster_html
+
+    def put(self, key, png_bytes, poster_html):
+        if self.max_bytes <= 0:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        write_atomic(os.path.join(self.directory, key + '.html'), poster_html.encode('utf-8'))
+        write_atomic(os.path.join(self.directory, key + '.png'), png_bytes) # Written last: its presence marks a complete entry
+        with self._lock:
+            self.stores += 1
+            self.evictions += evict_lru(self.directory, self.max_bytes)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+
+class ExtractionCache:
+    # Untranslated poster data per rally page as JSON, stored with the digest of the page it
+    # was extracted from and the extractor version. A changed page or parser is a miss.
+    # max_bytes=0 disables the cache.
+
+    def __init__(self, cache_dir=None, max_bytes=20 * 1024 * 1024):
+        self.directory = os.path.join(cache_dir or DEFAULT_CACHE_DIR, 'extractions')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, source, digest, version):
+        # Returns the poster data or None
+        if self.max_bytes <= 0:
+            return None
+        path = os.path.join(self.directory, cache_key(source) + '.json')
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+        if entry is None or entry.get('digest') != digest or entry.get('version') != version:
+            with self._lock:
+                self.misses += 1
+            return None
+        touch(path)
+        with self._lock:
+            self.hits += 1
+        return entry['poster_data']
+
+    def put(self, source, digest, version, poster_data):
+        if self.max_bytes <= 0:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {"source": source, "digest": digest, "version": version, "extracted_at": time.time(), "poster_data": poster_data}
+        write_atomic(os.path.join(self.directory, cache_key(source) + '.json'), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        with self._lock:
+            evict_lru(self.directory, self.max_bytes)
+
+    def clear(self):
+        evict_lru(self.directory, 0)
+
+
+_default_http_cache = None
+_default_http_cache_lock = threading.Lock()
+
+def get_default_http_cache():
+    global _default_http_cache
+    with _default_http_cache_lock:
+        if _default_http_cache is None:
+            _default_http_cache = HttpCache()
+        return _default_http_cache
+
+def set_default_http_cache(cache):
+    global _default_http_cache
+    with _default_http_cache_lock:
+        _default_http_cache = cache
+
+
+_default_render_cache = None
+_default_render_cache_lock = threading.Lock()
+
+def get_default_render_cache():
+    global _default_render_cache
+    with _default_render_cache_lock:
+        if _default_render_cache is None:
+            _default_render_cache = RenderCache()
+        return _default_render_cache
+
+def set_default_render_cache(cache):
+    global _default_render_cache
+    with _default_render_cache_lock:
+        _default_render_cache = cache
+
+
+_default_extraction_cache = None
+_default_extraction_cache_lock = threading.Lock()
+
+def get_default_extraction_cache():
+    global _default_extraction_cache
+    with _default_extraction_cache_lock:
+        if _default_extraction_cache is None:
+            _default_extraction_cache = ExtractionCache()
+        return _default_extraction_cache
+
+def set_default_extraction_cache(cache):
+    global _default_extraction_cache
+    with _default_extraction_cache_lock:
+        _default_extraction_cache = cache
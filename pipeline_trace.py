@@ -0,0 +1,138 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Which poster the current code works on. A ContextVar rather than a thread-local so the
+# label follows asyncio tasks and asyncio.to_thread calls.
+_current_poster = contextvars.ContextVar('current_poster', default=None)
+
+
+class _NullSpan:
+    # Returned while tracing is off: entering and leaving it costs a couple of method calls
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'poster', 'attrs', 'started')
+
+    def __init__(self, tracer, name, poster, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.poster = poster
+        self.attrs = attrs
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.started, time.perf_counter() - self.started, self.poster, self.attrs)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self._events = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def span(self, name, poster=None, **attrs):
+        # Times a `with` block. poster defaults to the label set with poster(); pass it
+        # explicitly where work hops onto another thread's event loop.
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, poster if poster is not None else _current_poster.get(), attrs)
+
+    def record(self, name, started, duration, poster=None, attrs=None):
+        event = {
+            "name": name,
+            "poster": poster if poster is not None else _current_poster.get(),
+            "thread": threading.current_thread().name,
+            "start_ms": (started - self._origin) * 1000,
+            "duration_ms": duration * 1000,
+        }
+        if attrs:
+            event["attrs"] = attrs
+        with self._lock:
+            self._events.append(event)
+
+    @contextmanager
+    def poster(self, label):
+        token = _current_poster.set(label)
+        try:
+            yield
+        finally:
+            _current_poster.reset(token)
+
+    def current_poster(self):
+        return _current_poster.get()
+
+    def events(self, poster=None):
+        with self._lock:
+            events = list(self._events)
+        if poster is not None:
+            events = [event for event in events if event["poster"] == poster]
+        return events
+
+    def clear(self):
+        with self._lock:
+            self._events = []
+
+    def export_jsonl(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for event in self.events():
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def export_chrome_trace(self, path):
+        # Loadable in chrome://tracing or Perfetto; one row per thread, poster in the args
+        thread_ids = {}
+        trace_events = []
+        for event in self.events():
+            tid = thread_ids.setdefault(event["thread"], len(thread_ids) + 1)
+            args = dict(event.get("attrs") or {})
+            if event["poster"] is not None:
+                args["poster"] = event["poster"]
+            trace_events.append({
+                "name": event["name"],
+                "ph": "X",
+                "ts": event["start_ms"] * 1000,
+                "dur": event["duration_ms"] * 1000,
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": args,
+            })
+        for thread_name, tid in thread_ids.items():
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread_name}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+
+    def export(self, path):
+        # .jsonl/.ndjson writes JSON lines, anything else a Chrome trace file
+        if path.endswith('.jsonl') or path.endswith('.ndjson'):
+            self.export_jsonl(path)
+        else:
+            self.export_chrome_trace(path)
+
+
+tracer = Tracer()
@@ -0,0 +1,132 @@
+import argparse
+import base64
+import os
+import sys
+
+# Fonts shipped in FONTS_DIR and embedded into every poster as @font-face rules, so
+# Chromium never falls back to whatever the machine has installed. The faces keep the
+# family names the poster CSS uses; 'Impact' is backed by Anton, a free look-alike, and
+# 'Libre Bodoni' by Bodoni Moda Bold, a Bodoni revival of the same style.
+# (CSS family, CSS weight, CSS style, file base name; the shipped file is a subset
+# <base>.woff2, .woff or .ttf built from <base>.ttf by `python poster_fonts.py subset`)
+FONT_FACES = (
+    ('Roboto', 'normal', 'normal', 'Roboto-Regular'),
+    ('Roboto', 'bold', 'normal', 'Roboto-Bold'),
+    ('Roboto', 'normal', 'italic', 'Roboto-Italic'), # Service rows
+    ('Libre Bodoni', 'bold', 'normal', 'BodoniModa-Bold'),
+    ('Impact', '100 900', 'normal', 'Anton-Regular'), # Single weight; h1 is bold, don't synthesize it
+)
+
+# Faces cut from a variable font: base name -> (source file, axis values of the instance).
+# The optical size matches the h2/h3 headings (24-27px).
+FONT_INSTANCES = {
+    'BodoniModa-Bold': ('BodoniModa[opsz,wght].ttf', {'wght': 700, 'opsz': 24}),
+}
+
+# (extension, CSS format, MIME type), preferred first
+FONT_FORMATS = (('.woff2', 'woff2', 'font/woff2'), ('.woff', 'woff', 'font/woff'), ('.ttf', 'truetype', 'font/ttf'))
+
+# Everything a poster can contain: ASCII, Latin-1 (umlauts, accented driver and stage
+# names) and the typographic punctuation the RSF pages and the info box use
+POSTER_CHARACTERS = (''.join(map(chr, range(0x20, 0x7f))) + ''.join(map(chr, range(0xa0, 0x100)))
+                     + '–—‘’‚“”„…•€™')
+
+def _default_fonts_dir():
+    # PyInstaller unpacks the datas into sys._MEIPASS (the _internal folder of the onedir build)
+    base_dir = getattr(sys, '_MEIPASS', None) or os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, 'fonts')
+
+FONTS_DIR = os.environ.get('RSF_POSTER_FONTS_DIR') or _default_fonts_dir()
+
+_font_face_css = None
+
+def find_font_file(base_name, fonts_dir=None):
+    # (path, CSS format, MIME type) of the shipped file for a face, or (None, None, None)
+    fonts_dir = fonts_dir or FONTS_DIR
+    for extension, css_format, mime_type in FONT_FORMATS:
+        path = os.path.join(fonts_dir, base_name + extension)
+        if os.path.isfile(path):
+            return path, css_format, mime_type
+    return None, None, None
+
+def font_face_css():
+    # @font-face rules with the fonts inlined as data: URIs. Read once per process; faces
+    # without a shipped file are left out and resolve against the system fonts as before.
+    global _font_face_css
+    if _font_face_css is None:
+        rules = []
+        for family, weight, style, base_name in FONT_FACES:
+            path, css_format, mime_type = find_font_file(base_name)
+            if path is None:
+                continue
+            with open(path, "rb") as f:
+                data = base64.b64encode(f.read()).decode('ascii')
+            rules.append(f"@font-face {{ font-family: '{family}'; font-weight: {weight}; font-style: {style}; font-display: block; "
+                         f"src: url(data:{mime_type};base64,{data}) format('{css_format}'); }}\n")
+        _font_face_css = ''.join(rules)
+    return _font_face_css
+
+def missing_fonts():
+    return [base_name for _, _, _, base_name in FONT_FACES if find_font_file(base_name)[0] is None]
+
+
+def subset_fonts(source_dir, target_dir=None, flavor='woff2'):
+    # Builds the shipped files from the full fonts (<base>.ttf in source_dir, or the variable
+    # font named in FONT_INSTANCES), keeping only POSTER_CHARACTERS. Needs fontTools, and
+    # brotli for woff2. Returns {base: (before, after)}.
+    from fontTools import subset
+    from fontTools.varLib import instancer
+    target_dir = target_dir or FONTS_DIR
+    os.makedirs(target_dir, exist_ok=True)
+    extension = {'woff2': '.woff2', 'woff': '.woff', None: '.ttf'}[flavor]
+    sizes = {}
+    for _, _, _, base_name in FONT_FACES:
+        source_path = os.path.join(source_dir, base_name + '.ttf')
+        axis_values = None
+        if not os.path.isfile(source_path) and base_name in FONT_INSTANCES:
+            source_name, axis_values = FONT_INSTANCES[base_name]
+            source_path = os.path.join(source_dir, source_name)
+        if not os.path.isfile(source_path):
+            continue
+        options = subset.Options()
+        options.flavor = flavor
+        font = subset.load_font(source_path, options)
+        if axis_values is not None and 'fvar' in font:
+            font = instancer.instantiateVariableFont(font, axis_values)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=POSTER_CHARACTERS)
+        subsetter.subset(font)
+        target_path = os.path.join(target_dir, base_name + extension)
+        subset.save_font(font, target_path, options)
+        sizes[base_name] = (os.path.getsize(source_path), os.path.getsize(target_path))
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Schriften für die Poster bündeln.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    subset_command = commands.add_parser("subset", help="Schriften auf die Poster-Zeichen reduzieren und in den fonts-Ordner schreiben")
+    subset_command.add_argument("source_dir", help="Ordner mit den vollständigen TTF-Dateien (" + ", ".join(FONT_INSTANCES.get(face[3], (f"{face[3]}.ttf",))[0] for face in FONT_FACES) + ")")
+    subset_command.add_argument("-o", "--output-dir", default=FONTS_DIR, help=f"Zielordner (Standard: {FONTS_DIR})")
+    subset_command.add_argument("--format", choices=("woff2", "woff", "ttf"), default="woff2", help="Dateiformat (Standard: woff2)")
+    commands.add_parser("check", help="Anzeigen, welche Schriften gebündelt sind")
+    args = parser.parse_args(argv)
+
+    if args.command == "subset":
+        sizes = subset_fonts(args.source_dir, args.output_dir, None if args.format == "ttf" else args.format)
+        for base_name, (before, after) in sizes.items():
+            print(f"{base_name:<20} {before // 1024:>6} KB -> {after // 1024:>4} KB")
+        skipped = [face[3] for face in FONT_FACES if face[3] not in sizes]
+        if skipped:
+            print("Nicht gefunden: " + ", ".join(FONT_INSTANCES.get(base_name, (f"{base_name}.ttf",))[0] for base_name in skipped))
+        return 0 if sizes else 1
+
+    missing = missing_fonts()
+    for family, weight, style, base_name in FONT_FACES:
+        path = find_font_file(base_name)[0]
+        print(f"{'OK' if path else 'FEHLT':<6} {family} {weight} {style}: {path or base_name}")
+    return 0 if not missing else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
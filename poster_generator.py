@@ -1,12 +1,29 @@
+import time
+_process_started = time.perf_counter() # Reference point for --startup-time
+import argparse
+import asyncio
+import atexit
+import concurrent.futures
+import contextlib
+import hashlib
+import json
 import os
 import re
-import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 import sys
 import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
 import threading # To run blocking tasks in a separate thread
+import tracemalloc
+import queue
+from urllib.parse import urlsplit
+
+from pipeline_trace import tracer
+from poster_fonts import font_face_css
+from poster_image import IMAGE_FORMATS, ImageOptions, encode_images, needs_pillow, parse_formats
+_imports_done = time.perf_counter()
+# requests, bs4, lxml, playwright and disk_cache (which pulls in requests) take about half
+# a second to import. They are imported where they are used and preloaded in a background
+# thread once the window is up, see preload_modules().
 
 # Set Playwright browsers path for PyInstaller executable
 if getattr(sys, 'frozen', False):
@@ -72,216 +89,597 @@ translations = {
 
 # --- Core Logic Functions (Adapted for GUI) ---
 
+class CompiledTranslator:
+    # The whole dictionary compiled into one alternation regex (longest keys first), so a
+    # string is translated in a single pass. Results are memoized because the same
+    # surface/weather/service strings repeat on nearly every stage.
+
+    def __init__(self, dictionary, memo_size=1024):
+        self.memo_size = memo_size
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+
+        # Exact matches of multi-word phrases win outright; first key in dict order takes precedence
+        self._phrases = {}
+        for en_key, de_value in dictionary.items():
+            if ' ' in en_key:
+                self._phrases.setdefault(en_key.lower(), de_value)
+
+        self._sorted_items = sorted(dictionary.items(), key=lambda item: len(item[0]), reverse=True)
+        # One group per key: the replacement is found by the group that matched, not by the
+        # matched text, which IGNORECASE may have case-folded ('ſ' matches 's')
+        self._group_values = [de_value for _, de_value in self._sorted_items]
+        self._pattern = None
+        if self._sorted_items:
+            alternation = '|'.join('(' + re.escape(en_key) + ')' for en_key, _ in self._sorted_items)
+            self._pattern = re.compile(r'\b(?:' + alternation + r')\b', re.IGNORECASE)
+            if not self._is_single_pass_safe():
+                self._pattern = None
+
+    def __call__(self, text):
+        cached = self._memo.get(text)
+        if cached is not None:
+            return cached
+        translated_text = self._translate(text)
+        with self._memo_lock:
+            if len(self._memo) >= self.memo_size:
+                self._memo.pop(next(iter(self._memo))) # Drop the oldest entry
+            self._memo[text] = translated_text
+        return translated_text
+
+    def _translate(self, text):
+        phrase = self._phrases.get(text.lower())
+        if phrase is not None:
+            return phrase
+        if self._pattern is not None:
+            return self._single_pass(text).strip()
+        return self._sequential(text).strip()
+
+    def _single_pass(self, text):
+        return self._pattern.sub(lambda match: self._group_values[match.lastindex - 1], text)
+
+    def _sequential(self, text):
+        # Key after key, longest first. Used when one substitution can feed the next.
+        translated_text = text
+        for en_key, de_value in self._sorted_items:
+            pattern = r'\b' + re.escape(en_key) + r'\b'
+            try:
+                translated_text = re.sub(pattern, de_value, translated_text, flags=re.IGNORECASE)
+            except re.error:
+                translated_text = translated_text.replace(en_key, de_value)
+        return translated_text
+
+    def _is_single_pass_safe(self):
+        # One pass equals the key-by-key replacement as long as no replacement text can be
+        # matched again and keys that share words resolve their overlaps the same way.
+        for en_key, de_value in self._sorted_items:
+            if not re.match(r'\w', en_key) or not re.search(r'\w$', en_key):
+                return False # \b next to non-word characters matches differently
+            if '\\' in de_value or self._pattern.search(de_value):
+                return False
+        probes = []
+        for en_key, _ in self._sorted_items:
+            key_words = en_key.split()
+            for other_key, _ in self._sorted_items:
+                if other_key is en_key or not set(re.findall(r'\w+', en_key.lower())) & set(re.findall(r'\w+', other_key.lower())):
+                    continue # Keys without a common word cannot overlap
+                other_words = other_key.split()
+                probes.append(en_key + ' ' + other_key)
+                for n in range(1, min(len(key_words), len(other_words)) + 1):
+                    if [w.lower() for w in key_words[-n:]] == [w.lower() for w in other_words[:n]]:
+                        probes.append(' '.join(key_words + other_words[n:]))
+        return all(self._single_pass(probe) == self._sequential(probe) for probe in probes)
+
+
+_translator_cache = {}
+_translator_cache_lock = threading.Lock()
+
+def get_translator(dictionary):
+    key = tuple(dictionary.items())
+    translator = _translator_cache.get(key)
+    if translator is None:
+        with _translator_cache_lock:
+            translator = _translator_cache.get(key)
+            if translator is None:
+                if len(_translator_cache) >= 8:
+                    _translator_cache.clear()
+                translator = _translator_cache[key] = CompiledTranslator(dictionary)
+    return translator
+
 def translate_iteratively(text, dictionary):
-    # First, handle specific multi-word phrases if they match exactly (case-insensitive)
-    for en_key, de_value in dictionary.items():
-         if ' ' in en_key: # Check if it's a multi-word key
-             if en_key.lower() == text.lower():
-                 return de_value
-
-    translated_text = text
-    sorted_translations = sorted(dictionary.items(), key=lambda item: len(item[0]), reverse=True)
-    for en_key, de_value in sorted_translations:
-        pattern = r'\b' + re.escape(en_key) + r'\b'
-        try:
-            translated_text = re.sub(pattern, de_value, translated_text, flags=re.IGNORECASE)
-        except re.error:
-            translated_text = translated_text.replace(en_key, de_value)
-    return translated_text.strip()
+    return get_translator(dictionary)(text)
 
-def fetch_html_content(url, status_callback):
+def fetch_html_content(url, status_callback, cache=None, timeout=None, decode=True):
     if not url or not (url.startswith('http://') or url.startswith('https://')):
         return None, "Ungültige URL: Bitte gib eine gültige URL ein."
+    import requests
+    from disk_cache import get_default_http_cache
     try:
         status_callback("Rufe Daten ab...")
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        try:
-            content = response.content.decode('latin-1')
-        except UnicodeDecodeError:
-            response.encoding = response.apparent_encoding or 'utf-8'
-            content = response.text
-        status_callback("Daten erfolgreich abgerufen.")
+        if cache is None:
+            cache = get_default_http_cache()
+        with tracer.span("http_request", url=url) as span:
+            page = cache.get(url, timeout=timeout)
+            span.set(cache=page.status, bytes=len(page.content))
+        if not decode:
+            content = page.content # Raw bytes, generate_poster_data hands them straight to lxml
+        else:
+            with tracer.span("decode"):
+                try:
+                    content = page.content.decode('latin-1')
+                except UnicodeDecodeError:
+                    content = page.content.decode('utf-8', errors='replace')
+        if page.status == 'downloaded':
+            status_callback("Daten erfolgreich abgerufen.")
+        else:
+            status_callback("Daten aus dem Cache geladen.")
         return content, None # Return content and no error
     except requests.exceptions.RequestException as e:
         return None, f"Fehler beim Abrufen: Konnte die URL nicht laden:\n{e}"
     except Exception as e:
         return None, f"Ein unerwarteter Fehler ist aufgetreten:\n{e}"
 
-def generate_poster_data(html_content, translate, status_callback):
+async def fetch_many_async(urls, status_callback, max_per_host=4, timeout=15, cache=None):
+    # Async generator yielding (url, raw_html_bytes, error) in completion order. Downloads go
+    # through the pooled session on worker threads; a semaphore per host keeps us polite.
+    from disk_cache import get_default_http_cache
+    if cache is None:
+        cache = get_default_http_cache()
+    host_limits = {}
+    quiet = lambda message: None
+
+    async def fetch_one(url):
+        try:
+            host = urlsplit(url).netloc.lower()
+        except ValueError as e: # Malformed line in the URL file; fails only this URL
+            return url, None, f"Fehler beim Abrufen: Ungültige URL:\n{e}"
+        if host not in host_limits:
+            host_limits[host] = asyncio.Semaphore(max_per_host)
+        async with host_limits[host]:
+            # Each task runs in its own context copy, so the label stays with this URL
+            # and asyncio.to_thread carries it into the download thread
+            with tracer.poster(url):
+                try:
+                    html_content, error = await asyncio.wait_for(
+                        asyncio.to_thread(fetch_html_content, url, quiet, cache, timeout, False), timeout * 2)
+                except asyncio.TimeoutError:
+                    html_content, error = None, f"Fehler beim Abrufen: Zeitüberschreitung nach {timeout * 2:.0f} s."
+        return url, html_content, error
+
+    status_callback(f"Rufe Daten ab... (0/{len(urls)})")
+    tasks = [asyncio.ensure_future(fetch_one(url)) for url in urls]
+    for done, next_finished in enumerate(asyncio.as_completed(tasks), start=1):
+        url, html_content, error = await next_finished
+        status_callback(f"Rufe Daten ab... ({done}/{len(urls)})")
+        yield url, html_content, error
+
+def fetch_and_parse_many(urls, status_callback, on_result, max_per_host=4, timeout=15, cache=None):
+    # Each page is parsed as soon as its download finishes (unless the extraction cache has
+    # it already); on_result(url, poster_data, error) is called once per URL from the event
+    # loop thread with the untranslated extraction.
+    quiet = lambda message: None
+
+    async def parse(url, html_content):
+        with tracer.poster(url):
+            poster_data, error = await asyncio.to_thread(extract_poster_data_cached, html_content, quiet, url)
+        on_result(url, poster_data, error)
+
+    async def pipeline():
+        parse_tasks = []
+        async for url, html_content, error in fetch_many_async(urls, status_callback, max_per_host, timeout, cache):
+            if error:
+                on_result(url, None, error)
+            else:
+                parse_tasks.append(asyncio.create_task(parse(url, html_content)))
+        await asyncio.gather(*parse_tasks)
+
+    asyncio.run(pipeline())
+
+def generate_poster_data(html_content, translate, status_callback, parser='lxml'):
+    # Extraction plus, with translate, the German view of it in one call
+    poster_data, error = extract_poster_data(html_content, status_callback, parser)
+    if error:
+        return None, error
+    return translate_poster_data(poster_data, translate), None
+
+# Part of every extraction cache entry; bump when the parsers extract anything differently
+EXTRACTION_VERSION = 1
+
+def extract_poster_data(html_content, status_callback, parser='lxml'):
+    # The rally page as found, in English ("language": "en"); translation is a view applied
+    # at render time, see translate_poster_data. html_content may be the raw response bytes
+    # (decoded as latin-1, like fetch_html_content does) or an already decoded str.
+    # parser='soup' selects the BeautifulSoup reference path.
     if not html_content:
         return None, "Kein HTML-Inhalt zum Verarbeiten."
 
-    rally_name = "poster" # Default
-    total_distance = ""
-    car_name = ""
-    legs = []
-    error_message = None
-
     try:
         status_callback("Verarbeite HTML...")
-        soup = BeautifulSoup(html_content, 'lxml')
-
-        main_content_td = soup.find('td', class_='szdb', style=lambda value: value and 'padding:5px' in value)
-        if not main_content_td:
+        with tracer.span("soup_build", parser=parser):
+            if parser == 'soup':
+                main_content_td = _find_main_content_td_soup(html_content)
+            else:
+                main_content_td = _find_main_content_td(html_content)
+        if main_content_td is None:
             return None, "Konnte den Hauptinhaltsbereich nicht finden."
 
-        # Extract Rally Name, Distance, Car Group
-        rally_info_table = main_content_td.find_all('table', recursive=False)[0]
-        rally_name_tag = rally_info_table.find('tr', class_='fejlec').find('td').find('b')
-        rally_name = rally_name_tag.get_text(strip=True) if rally_name_tag else 'N/A'
-
-        rally_info_rows = rally_info_table.find_all('tr')
-        for row in rally_info_rows:
-            cells = row.find_all('td')
-            if len(cells) > 1:
-                first_cell_text = cells[0].get_text(strip=True)
-                if first_cell_text == 'Total Distance Rally:':
-                    total_distance = cells[1].get_text(strip=True)
-                elif first_cell_text == 'Car Groups:':
-                    car_name = cells[1].get_text(strip=True)
-
-        # Extract Stage Data
-        all_tables = main_content_td.find_all('table', recursive=False)
-        if len(all_tables) < 2:
-            return None, "Konnte die Wertungsprüfungstabelle nicht finden."
-
-        stage_table = all_tables[1]
-        stage_rows = stage_table.find_all('tr')
-        current_leg = None
-
-        for i, stage_row in enumerate(stage_rows):
-            if i == 0: continue # Skip header row
-            stage_cells = stage_row.find_all('td')
-            first_cell = stage_cells[0] if len(stage_cells) > 0 else None
-
-            # Check for Leg Header
-            if first_cell and 'lista_kiemelt' in first_cell.get('class', []):
-                bold_tag = first_cell.find('b')
-                if bold_tag and 'Leg' in bold_tag.get_text():
-                    leg_name_raw = bold_tag.get_text(strip=True)
-                    leg_name = leg_name_raw.replace('Leg', 'Etappe') if translate else leg_name_raw
-                    if len(stage_cells) > 2 and 'lista_kiemelt' in stage_cells[2].get('class', []):
-                        distance_bold = stage_cells[2].find('b')
-                        if distance_bold:
-                            leg_name += f" ({distance_bold.get_text(strip=True)})"
-                    current_leg = {"name": leg_name, "items": []}
-                    legs.append(current_leg)
-                    continue # Move to next row after processing leg header
-
-            # Check for Service Park or Road Side Service
-            is_service = 'servicepark' in stage_row.get('class', [])
-            is_road_service = current_leg and len(stage_cells) >= 2 and 'Road Side Service' in stage_cells[1].get_text()
-
-            if is_service or is_road_service:
-                if current_leg and len(stage_cells) >= 2:
-                    full_text_raw = stage_cells[1].get_text(strip=True)
-                    full_text_cleaned = re.sub(r'\s*-\s*', ' - ', full_text_raw).strip()
-                    service_text = translate_iteratively(full_text_cleaned, translations) if translate else full_text_cleaned
-                    current_leg["items"].append({"type": "service", "cleaned_text": service_text})
-                continue # Move to next row
-
-            # Process Stage Row
-            if current_leg and len(stage_cells) >= 5:
-                try:
-                    int(stage_cells[0].get_text(strip=True)) # Check if first cell is a stage number
-                    stage_name_div = stage_cells[1].find('div')
-                    stage_name = re.sub(r'(\r\n|\n|\r)', '', (stage_name_div.get_text(strip=True) if stage_name_div else stage_cells[1].get_text(strip=True)))
-                    stage_length = re.sub(r'(\r\n|\n|\r)', '', stage_cells[2].get_text(strip=True))
-                    surface_en = re.sub(r'(\r\n|\n|\r)', '', stage_cells[3].get_text(strip=True))
-                    weather_en = re.sub(r'(\r\n|\n|\r)', '', stage_cells[4].get_text(strip=True))
-
-                    surface_formatted = re.sub(r'\s*\(([^)]+)\)', r', \1', surface_en)
-                    weather_formatted = ', '.join(weather_en.split())
-
-                    surface_de = translate_iteratively(surface_formatted, translations) if translate else surface_formatted
-                    weather_de = translate_iteratively(weather_formatted, translations) if translate else weather_formatted
-
-                    current_leg["items"].append({
-                        "type": "stage",
-                        "name": stage_name,
-                        "length": stage_length,
-                        "surface": surface_de,
-                        "weather": weather_de
-                    })
-                except (ValueError, IndexError):
-                    pass # Ignore rows that don't look like stages
-
+        with tracer.span("table_walk", parser=parser):
+            if parser == 'soup':
+                poster_data, error_message = _walk_poster_tables_soup(main_content_td)
+            else:
+                poster_data, error_message = _walk_poster_tables_lxml(main_content_td)
+        if error_message:
+            return None, error_message
+        poster_data["language"] = "en"
         status_callback("HTML erfolgreich verarbeitet.")
-        poster_data = {
-            "rally_name": rally_name,
-            "total_distance": total_distance,
-            "car_name": car_name,
-            "legs": legs
-        }
         return poster_data, None
 
     except Exception as e:
         error_message = f"Fehler bei der HTML-Verarbeitung:\n{e}"
         return None, error_message
 
+def extract_poster_data_cached(html_content, status_callback, source=None, cache=None, parser='lxml'):
+    # extract_poster_data through the extraction cache: the result is stored per source
+    # (the rally URL, else the page digest) with the digest of the page, so the German and
+    # the English poster of a page, or the same page fetched again, are parsed only once
+    from disk_cache import get_default_extraction_cache
+    if cache is None:
+        cache = get_default_extraction_cache()
+    page_bytes = html_content.encode('utf-8') if isinstance(html_content, str) else (html_content or b'')
+    digest = hashlib.sha256(page_bytes).hexdigest()
+    source = source or "sha256:" + digest
+    version = f"{EXTRACTION_VERSION}/{parser}"
+    with tracer.span("extraction_cache_lookup") as span:
+        poster_data = cache.get(source, digest, version)
+        span.set(hit=poster_data is not None)
+    if poster_data is not None:
+        status_callback("Posterdaten aus dem Cache geladen.")
+        return poster_data, None
+    poster_data, error = extract_poster_data(html_content, status_callback, parser)
+    if poster_data is not None:
+        try:
+            cache.put(source, digest, version, poster_data)
+        except OSError:
+            pass # A full or read-only cache must not fail the poster
+    return poster_data, error
+
+def translate_poster_data(poster_data, translate=True):
+    # The German view of an English extraction: surface, weather and service texts run
+    # through the translator, "Leg" becomes "Etappe". Anything that is not an English
+    # extraction (already translated, or translate off) comes back unchanged, so applying
+    # the view twice is harmless.
+    if not translate or not poster_data or poster_data.get("language") != "en":
+        return poster_data
+    translator = get_translator(translations)
+    if tracer.enabled:
+        translator = _TimedTranslator(translator)
+    legs = []
+    for leg in poster_data['legs']:
+        items = []
+        for item in leg['items']:
+            if item['type'] == 'stage':
+                item = dict(item, surface=translator(item['surface']), weather=translator(item['weather']))
+            elif item['type'] == 'service':
+                item = dict(item, cleaned_text=translator(item['cleaned_text']))
+            items.append(item)
+        legs.append(dict(leg, name=leg['name'].replace('Leg', 'Etappe'), items=items))
+    if isinstance(translator, _TimedTranslator) and translator.calls:
+        # One span for all cells of the page
+        tracer.record("translation", translator.first_started, translator.seconds, attrs={"calls": translator.calls, "aggregated": True})
+    return dict(poster_data, legs=legs, language="de")
+
+class _TimedTranslator:
+    # Only used while tracing: sums up the time spent translating the cells of one page
+    def __init__(self, translator):
+        self.translator = translator
+        self.first_started = None
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __call__(self, text):
+        started = time.perf_counter()
+        if self.first_started is None:
+            self.first_started = started
+        translated_text = self.translator(text)
+        self.seconds += time.perf_counter() - started
+        self.calls += 1
+        return translated_text
+
+_SERVICE_DASH = re.compile(r'\s*-\s*')
+_SURFACE_PARENS = re.compile(r'\s*\(([^)]+)\)')
+_NEWLINES = re.compile(r'(\r\n|\n|\r)')
+
+def _service_item(full_text_raw):
+    return {"type": "service", "cleaned_text": _SERVICE_DASH.sub(' - ', full_text_raw).strip()}
+
+def _stage_item(stage_name, stage_length, surface_en, weather_en):
+    return {
+        "type": "stage",
+        "name": stage_name,
+        "length": stage_length,
+        "surface": _SURFACE_PARENS.sub(r', \1', surface_en),
+        "weather": ', '.join(weather_en.split())
+    }
 
-def create_poster_files(poster_data, save_path, translate, status_callback):
-    if not poster_data or not save_path:
-        return False, "Fehlende Daten oder Speicherpfad.", None
+def _strip_newlines(text):
+    return _NEWLINES.sub('', text)
 
-    rally_name = poster_data['rally_name']
-    total_distance = poster_data['total_distance']
-    car_name = poster_data['car_name']
-    legs = poster_data['legs']
+def _find_main_content_td_soup(html_content):
+    if isinstance(html_content, bytes):
+        with tracer.span("decode"):
+            html_content = html_content.decode('latin-1')
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, 'lxml')
+    return soup.find('td', class_='szdb', style=lambda value: value and 'padding:5px' in value)
+
+def _walk_poster_tables_soup(main_content_td):
+    rally_name = "poster" # Default
+    total_distance = ""
+    car_name = ""
+    legs = []
 
-    header_translations = {
-        True: {"stage": "Wertungsprüfung", "length": "Länge", "surface": "Zustand", "weather": "Bedingungen", "distance_label": "Distanz"},
-        False: {"stage": "Stage name", "length": "Distance", "surface": "Surface", "weather": "Weather", "distance_label": "Distance"}
+    # Extract Rally Name, Distance, Car Group
+    rally_info_table = main_content_td.find_all('table', recursive=False)[0]
+    fejlec_row = rally_info_table.find('tr', class_='fejlec')
+    first_td = fejlec_row.find('td') if fejlec_row is not None else None
+    if first_td is None:
+        return None, "Konnte den Rallye-Namen nicht finden."
+    rally_name_tag = first_td.find('b')
+    rally_name = rally_name_tag.get_text(strip=True) if rally_name_tag else 'N/A'
+
+    rally_info_rows = rally_info_table.find_all('tr')
+    for row in rally_info_rows:
+        cells = row.find_all('td')
+        if len(cells) > 1:
+            first_cell_text = cells[0].get_text(strip=True)
+            if first_cell_text == 'Total Distance Rally:':
+                total_distance = cells[1].get_text(strip=True)
+            elif first_cell_text == 'Car Groups:':
+                car_name = cells[1].get_text(strip=True)
+
+    # Extract Stage Data
+    all_tables = main_content_td.find_all('table', recursive=False)
+    if len(all_tables) < 2:
+        return None, "Konnte die Wertungsprüfungstabelle nicht finden."
+
+    stage_table = all_tables[1]
+    stage_rows = stage_table.find_all('tr')
+    current_leg = None
+
+    for i, stage_row in enumerate(stage_rows):
+        if i == 0: continue # Skip header row
+        stage_cells = stage_row.find_all('td')
+        first_cell = stage_cells[0] if len(stage_cells) > 0 else None
+
+        # Check for Leg Header
+        if first_cell and 'lista_kiemelt' in first_cell.get('class', []):
+            bold_tag = first_cell.find('b')
+            if bold_tag and 'Leg' in bold_tag.get_text():
+                leg_name = bold_tag.get_text(strip=True)
+                if len(stage_cells) > 2 and 'lista_kiemelt' in stage_cells[2].get('class', []):
+                    distance_bold = stage_cells[2].find('b')
+                    if distance_bold:
+                        leg_name += f" ({distance_bold.get_text(strip=True)})"
+                current_leg = {"name": leg_name, "items": []}
+                legs.append(current_leg)
+                continue # Move to next row after processing leg header
+
+        # Check for Service Park or Road Side Service
+        is_service = 'servicepark' in stage_row.get('class', [])
+        is_road_service = current_leg and len(stage_cells) >= 2 and 'Road Side Service' in stage_cells[1].get_text()
+
+        if is_service or is_road_service:
+            if current_leg and len(stage_cells) >= 2:
+                current_leg["items"].append(_service_item(stage_cells[1].get_text(strip=True)))
+            continue # Move to next row
+
+        # Process Stage Row
+        if current_leg and len(stage_cells) >= 5:
+            try:
+                int(stage_cells[0].get_text(strip=True)) # Check if first cell is a stage number
+                stage_name_div = stage_cells[1].find('div')
+                stage_name = _strip_newlines(stage_name_div.get_text(strip=True) if stage_name_div else stage_cells[1].get_text(strip=True))
+                current_leg["items"].append(_stage_item(
+                    stage_name,
+                    _strip_newlines(stage_cells[2].get_text(strip=True)),
+                    _strip_newlines(stage_cells[3].get_text(strip=True)),
+                    _strip_newlines(stage_cells[4].get_text(strip=True))))
+            except (ValueError, IndexError):
+                pass # Ignore rows that don't look like stages
+
+    poster_data = {
+        "rally_name": rally_name,
+        "total_distance": total_distance,
+        "car_name": car_name,
+        "legs": legs
     }
-    headers = header_translations.get(translate, header_translations[True])
-
-    # --- Build HTML ---
-    status_callback("Erstelle HTML...")
-    poster_html = f"""
-<html>
-<head>
-<title>{rally_name}</title>
-<style>
-body {{ font-family: Roboto; padding: 25px; background-color: #f4f1e8; color: #333; -webkit-print-color-adjust: exact; print-color-adjust: exact; }}
-h1 {{ font-family: Impact, 'Arial Black', Gadget, sans-serif; text-align: center; color: #a00000; font-size: 3em; margin-bottom: 10px; text-transform: uppercase; letter-spacing: 1px; }}
-h2 {{ font-family: 'Libre Bodoni'; font-weight: bold; text-align: center; font-size: 1.7em; color: #444; margin-bottom: 10px; margin-top: 5px; text-transform: uppercase; }}
-h3 {{ font-family: 'Libre Bodoni'; font-weight: bold; text-align: center; font-size: 1.5em; color: #444; margin-bottom: 20px; margin-top: 0; text-transform: uppercase; }}
-.leg-header {{ background-color: #4d3d33; color: #f4f1e8; font-weight: bold; text-align: center; padding: 8px; margin-top: 25px; font-size: 1.4em; text-transform: uppercase; border: 1px solid #111; }}
-table {{ width: 100%; border-collapse: collapse; margin-top: 0; box-shadow: none; border: 1px solid #444; }}
-th, td {{ border: 1px solid #777; padding: 6px 8px; text-align: left; font-size: 0.95em; }}
-th {{ background-color: #777; color: #f4f1e8; font-weight: bold; text-transform: uppercase; font-size: 0.95em; }}
-.service-row td {{ font-style: italic; background-color: #dddddd; color: #222; padding: 8px 8px; }}
-tbody tr:not(.service-row) td:first-child {{ font-weight: bold; }}
-.info-box {{ background-color: #e9e5d9; border: 1px solid #555; padding: 15px; border-radius: 0px; margin-top: 25px; line-height: 1.5; font-size: 0.9em; color: #222; box-shadow: none; }}
-</style>
-</head>
-<body>
-<h1>{rally_name}</h1>
+    return poster_data, None
+
+# Compiled once, on the first lxml parse; the lxml path below mirrors the BeautifulSoup
+# walk above node for node
+_XPATH_TEXT = None
+_XPATH_FEJLEC_ROW = None
+
+def _compile_xpaths():
+    global _XPATH_TEXT, _XPATH_FEJLEC_ROW
+    from lxml import etree
+    _XPATH_FEJLEC_ROW = etree.XPath(".//tr[contains(concat(' ', normalize-space(@class), ' '), ' fejlec ')]")
+    _XPATH_TEXT = etree.XPath('.//text()')
+
+def _is_main_content_td(element):
+    return (element.tag == 'td'
+            and 'szdb' in (element.get('class') or '').split()
+            and 'padding:5px' in (element.get('style') or ''))
+
+def _find_main_content_td(html_content):
+    # Restricted parse: feed the page in chunks and stop as soon as the first matching
+    # td.szdb is closed, so everything after the content cell is never parsed.
+    from lxml import etree
+    if _XPATH_TEXT is None:
+        _compile_xpaths()
+    if isinstance(html_content, bytes):
+        pull_parser = etree.HTMLPullParser(events=('start', 'end'), tag='td', encoding='iso-8859-1') # libxml2's name for latin-1
+    else:
+        pull_parser = etree.HTMLPullParser(events=('start', 'end'), tag='td')
+    main_content_td = None
+    chunk_size = 64 * 1024
+    for offset in range(0, len(html_content), chunk_size):
+        pull_parser.feed(html_content[offset:offset + chunk_size])
+        for event, element in pull_parser.read_events():
+            if main_content_td is None:
+                if event == 'start' and _is_main_content_td(element):
+                    main_content_td = element
+            elif event == 'end' and element is main_content_td:
+                return main_content_td
+    pull_parser.close()
+    for event, element in pull_parser.read_events():
+        if main_content_td is None and event == 'start' and _is_main_content_td(element):
+            main_content_td = element
+    return main_content_td
+
+def _element_text(element, strip=True):
+    if strip:
+        return ''.join(text.strip() for text in _XPATH_TEXT(element))
+    return ''.join(_XPATH_TEXT(element))
+
+def _has_class(element, class_name):
+    return class_name in (element.get('class') or '').split()
+
+def _walk_poster_tables_lxml(main_content_td):
+    rally_name = "poster" # Default
+    total_distance = ""
+    car_name = ""
+    legs = []
+
+    # Extract Rally Name, Distance, Car Group
+    all_tables = main_content_td.findall('table')
+    rally_info_table = all_tables[0]
+    fejlec_rows = _XPATH_FEJLEC_ROW(rally_info_table)
+    first_td = next(fejlec_rows[0].iterdescendants('td'), None) if fejlec_rows else None
+    if first_td is None:
+        return None, "Konnte den Rallye-Namen nicht finden."
+    rally_name_tag = next(first_td.iterdescendants('b'), None)
+    rally_name = _element_text(rally_name_tag) if rally_name_tag is not None else 'N/A'
+
+    for row in rally_info_table.iterdescendants('tr'):
+        cells = list(row.iterdescendants('td'))
+        if len(cells) > 1:
+            first_cell_text = _element_text(cells[0])
+            if first_cell_text == 'Total Distance Rally:':
+                total_distance = _element_text(cells[1])
+            elif first_cell_text == 'Car Groups:':
+                car_name = _element_text(cells[1])
+
+    # Extract Stage Data
+    if len(all_tables) < 2:
+        return None, "Konnte die Wertungsprüfungstabelle nicht finden."
+
+    current_leg = None
+    for i, stage_row in enumerate(all_tables[1].iterdescendants('tr')):
+        if i == 0: continue # Skip header row
+        stage_cells = list(stage_row.iterdescendants('td'))
+        first_cell = stage_cells[0] if stage_cells else None
+
+        # Check for Leg Header
+        if first_cell is not None and _has_class(first_cell, 'lista_kiemelt'):
+            bold_tag = next(first_cell.iterdescendants('b'), None)
+            if bold_tag is not None and 'Leg' in _element_text(bold_tag, strip=False):
+                leg_name = _element_text(bold_tag)
+                if len(stage_cells) > 2 and _has_class(stage_cells[2], 'lista_kiemelt'):
+                    distance_bold = next(stage_cells[2].iterdescendants('b'), None)
+                    if distance_bold is not None:
+                        leg_name += f" ({_element_text(distance_bold)})"
+                current_leg = {"name": leg_name, "items": []}
+                legs.append(current_leg)
+                continue
+
+        # Check for Service Park or Road Side Service
+        is_service = _has_class(stage_row, 'servicepark')
+        is_road_service = current_leg and len(stage_cells) >= 2 and 'Road Side Service' in _element_text(stage_cells[1], strip=False)
+
+        if is_service or is_road_service:
+            if current_leg and len(stage_cells) >= 2:
+                current_leg["items"].append(_service_item(_element_text(stage_cells[1])))
+            continue
+
+        # Process Stage Row
+        if current_leg and len(stage_cells) >= 5:
+            try:
+                int(_element_text(stage_cells[0])) # Check if first cell is a stage number
+                stage_name_div = next(stage_cells[1].iterdescendants('div'), None)
+                stage_name = _strip_newlines(_element_text(stage_name_div if stage_name_div is not None else stage_cells[1]))
+                current_leg["items"].append(_stage_item(
+                    stage_name,
+                    _strip_newlines(_element_text(stage_cells[2])),
+                    _strip_newlines(_element_text(stage_cells[3])),
+                    _strip_newlines(_element_text(stage_cells[4]))))
+            except (ValueError, IndexError):
+                pass # Ignore rows that don't look like stages
+
+    poster_data = {
+        "rally_name": rally_name,
+        "total_distance": total_distance,
+        "car_name": car_name,
+        "legs": legs
+    }
+    return poster_data, None
+
+
+def compare_parsers(html_content, repeat=3):
+    # Side-by-side check of the lxml fast path against the BeautifulSoup reference
+    quiet = lambda message: None
+    report = {"equal": True}
+    for translate in (True, False):
+        reference = generate_poster_data(html_content, translate, quiet, parser='soup')
+        candidate = generate_poster_data(html_content, translate, quiet, parser='lxml')
+        report["equal"] = report["equal"] and reference == candidate
+    for parser in ('soup', 'lxml'):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            generate_poster_data(html_content, True, quiet, parser=parser)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        report[f"{parser}_seconds"] = best
+        # Peak of the Python heap while parsing; lxml's own C tree is not part of it
+        tracemalloc.start()
+        try:
+            generate_poster_data(html_content, True, quiet, parser=parser)
+            report[f"{parser}_peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return report
+
+
+# --- Poster Template ---
+# The static parts are assembled once at import; per poster only the dynamic values are
+# escaped and joined.
+
+POSTER_CSS = """body { font-family: Roboto; padding: 25px; background-color: #f4f1e8; color: #333; -webkit-print-color-adjust: exact; print-color-adjust: exact; }
+h1 { font-family: Impact, 'Arial Black', Gadget, sans-serif; text-align: center; color: #a00000; font-size: 3em; margin-bottom: 10px; text-transform: uppercase; letter-spacing: 1px; }
+h2 { font-family: 'Libre Bodoni'; font-weight: bold; text-align: center; font-size: 1.7em; color: #444; margin-bottom: 10px; margin-top: 5px; text-transform: uppercase; }
+h3 { font-family: 'Libre Bodoni'; font-weight: bold; text-align: center; font-size: 1.5em; color: #444; margin-bottom: 20px; margin-top: 0; text-transform: uppercase; }
+.leg-header { background-color: #4d3d33; color: #f4f1e8; font-weight: bold; text-align: center; padding: 8px; margin-top: 25px; font-size: 1.4em; text-transform: uppercase; border: 1px solid #111; }
+table { width: 100%; border-collapse: collapse; margin-top: 0; box-shadow: none; border: 1px solid #444; }
+th, td { border: 1px solid #777; padding: 6px 8px; text-align: left; font-size: 0.95em; }
+th { background-color: #777; color: #f4f1e8; font-weight: bold; text-transform: uppercase; font-size: 0.95em; }
+.service-row td { font-style: italic; background-color: #dddddd; color: #222; padding: 8px 8px; }
+tbody tr:not(.service-row) td:first-child { font-weight: bold; }
+.info-box { background-color: #e9e5d9; border: 1px solid #555; padding: 15px; border-radius: 0px; margin-top: 25px; line-height: 1.5; font-size: 0.9em; color: #222; box-shadow: none; }
 """
-    car_name_length = len(car_name.replace('<br>', ' '))
-    car_font_size = "1.2em" if car_name_length > 150 else ("1.4em" if car_name_length > 80 else "1.7em")
-    poster_html += f'<h2 style="font-size: {car_font_size};">{car_name}</h2>'
-    poster_html += f"<h3>{headers['distance_label']}: {total_distance}</h3>"
 
-    for leg in legs:
-        poster_html += f'<div class="leg-header">{leg["name"]}</div>'
-        poster_html += f"""
-<table><thead><tr>
-<th>{headers['stage']}</th><th>{headers['length']}</th><th>{headers['surface']}</th><th>{headers['weather']}</th>
-</tr></thead><tbody>"""
-        for item in leg["items"]:
-            if item["type"] == 'stage':
-                poster_html += f"""
-<tr><td>{item['name']}</td><td>{item['length']}</td><td>{item['surface']}</td><td>{item['weather']}</td></tr>"""
-            elif item["type"] == 'service':
-                service_text = item.get('cleaned_text', '').strip()
-                poster_html += f"""<tr class="service-row"><td colspan="4">{service_text}</td></tr>"""
-        poster_html += "</tbody></table>"
+_HEAD_BEFORE_TITLE = "\n<html>\n<head>\n<title>"
+_head_after_title = None
 
-    if rally_name.startswith("DE-DCR"):
-        poster_html += """
+def _poster_head_after_title():
+    # The bundled fonts are inlined ahead of the CSS the first time a poster is built, so
+    # the page needs no font lookups; see poster_fonts
+    global _head_after_title
+    if _head_after_title is None:
+        _head_after_title = "</title>\n<style>\n" + font_face_css() + POSTER_CSS + "</style>\n</head>\n<body>\n<h1>"
+    return _head_after_title
+
+_INFO_BOX_DE_DCR = """
 <div class="info-box">
 Nach jeder Wertungsprüfung ist es Fahrer und Beifahrer gestattet 5 Minuten Reparaturzeit in Anspruch zu nehmen.<br>
 Zwischen den Blöcken gibt es 60 Minuten Reparaturzeit mit bis zu 4 Mechanikern.<br>
@@ -289,46 +687,513 @@ Kein Wiedereinstieg nach Ausfall. Die Wertung erfolgt rollend über 4 Wochen.<br
 Punktevergabe: Ränge 1–10 erhalten Punkte: Sieger 20, Vize 18, ... 10. Platz 2 Punkte.<br>
 Passwort: Willkommen
 </div>"""
-    poster_html += "</body></html>"
 
-    # --- Save Files ---
-    html_path = os.path.splitext(save_path)[0] + ".html"
-    try:
-        status_callback("Speichere HTML...")
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(poster_html)
+# The same text for the browser-free backend, one entry per line
+_INFO_BOX_LINES = [line.strip() for line in re.sub(r'</?div[^>]*>', '', _INFO_BOX_DE_DCR).split('<br>') if line.strip()]
+
+header_translations = {
+    True: {"stage": "Wertungsprüfung", "length": "Länge", "surface": "Zustand", "weather": "Bedingungen", "distance_label": "Distanz"},
+    False: {"stage": "Stage name", "length": "Distance", "surface": "Surface", "weather": "Weather", "distance_label": "Distance"}
+}
+
+_TABLE_HEADS = {
+    translate: f"""
+<table><thead><tr>
+<th>{headers['stage']}</th><th>{headers['length']}</th><th>{headers['surface']}</th><th>{headers['weather']}</th>
+</tr></thead><tbody>"""
+    for translate, headers in header_translations.items()
+}
+
+_AMBIGUOUS_AMPERSAND = re.compile(r'&(?=[#0-9A-Za-z])')
+
+def escape_text(text):
+    # Escapes only what HTML would otherwise misread: tags and ampersands that could start a
+    # character reference. A plain "A & B" stays as it is, keeping existing posters unchanged.
+    if '<' not in text and '>' not in text and '&' not in text:
+        return text
+    return _AMBIGUOUS_AMPERSAND.sub('&amp;', text).replace('<', '&lt;').replace('>', '&gt;')
+
+def write_poster_html(poster_data, translate, write):
+    # Streams the poster markup piece by piece into write (e.g. list.append or file.write)
+    poster_data = translate_poster_data(poster_data, translate)
+    rally_name = escape_text(poster_data['rally_name'])
+    total_distance = escape_text(poster_data['total_distance'])
+    car_name = poster_data['car_name']
+    translate = translate if translate in _TABLE_HEADS else True
+    headers = header_translations[translate]
+    table_head = _TABLE_HEADS[translate]
+
+    write(_HEAD_BEFORE_TITLE)
+    write(rally_name)
+    write(_poster_head_after_title())
+    write(rally_name)
+    write("</h1>\n")
+
+    car_name_length = len(car_name.replace('<br>', ' '))
+    car_font_size = "1.2em" if car_name_length > 150 else ("1.4em" if car_name_length > 80 else "1.7em")
+    write(f'<h2 style="font-size: {car_font_size};">{escape_text(car_name)}</h2>')
+    write(f"<h3>{headers['distance_label']}: {total_distance}</h3>")
 
-        status_callback("Erstelle PNG mit Playwright...")
-        with sync_playwright() as p:
-            # Check if browsers are installed, install if necessary
+    for leg in poster_data['legs']:
+        write(f'<div class="leg-header">{escape_text(leg["name"])}</div>')
+        write(table_head)
+        for item in leg["items"]:
+            if item["type"] == 'stage':
+                write(f"\n<tr><td>{escape_text(item['name'])}</td><td>{escape_text(item['length'])}</td>"
+                      f"<td>{escape_text(item['surface'])}</td><td>{escape_text(item['weather'])}</td></tr>")
+            elif item["type"] == 'service':
+                service_text = escape_text(item.get('cleaned_text', '').strip())
+                write(f'<tr class="service-row"><td colspan="4">{service_text}</td></tr>')
+        write("</tbody></table>")
+
+    if poster_data['rally_name'].startswith("DE-DCR"):
+        write(_INFO_BOX_DE_DCR)
+    write("</body></html>")
+
+def build_poster_html(poster_data, translate):
+    parts = []
+    write_poster_html(poster_data, translate, parts.append)
+    return ''.join(parts)
+
+
+_template_version = None
+
+def template_version():
+    # Fingerprint of the poster template and CSS, taken from the markup a fixed sample
+    # produces. Any change to the template changes it and thereby every render cache key.
+    global _template_version
+    if _template_version is None:
+        sample = {
+            "rally_name": "DE-DCR Sample", "total_distance": "1 km", "car_name": "Group",
+            "legs": [{"name": "Leg 1", "items": [
+                {"type": "stage", "name": "S", "length": "1 km", "surface": "Tarmac", "weather": "Dry"},
+                {"type": "service", "cleaned_text": "Service Park"}]}],
+        }
+        markup = build_poster_html(sample, True) + build_poster_html(sample, False)
+        _template_version = hashlib.sha256(markup.encode('utf-8')).hexdigest()[:16]
+    return _template_version
+
+
+# 'chromium' screenshots the HTML poster in the warm browser; 'raster' draws the same
+# layout with Pillow (raster_renderer), without a browser and in a fraction of the time
+RENDER_BACKENDS = ('chromium', 'raster')
+
+def _render_cache_key(cache, poster_data, translate, scale, backend='chromium'):
+    if backend == 'raster':
+        import raster_renderer
+        return cache.key(poster_data, bool(translate), 'raster', raster_renderer.LAYOUT_VERSION, scale)
+    if scale == 1:
+        return cache.key(poster_data, bool(translate), template_version())
+    return cache.key(poster_data, bool(translate), template_version(), scale)
+
+def _check_backend(backend):
+    if backend not in RENDER_BACKENDS:
+        raise ValueError(f"Unbekanntes Render-Backend '{backend}'. Möglich: {', '.join(RENDER_BACKENDS)}.")
+
+def render_raster_png(poster_data, translate, scale=1):
+    import raster_renderer
+    poster_data = translate_poster_data(poster_data, translate)
+    translate = translate if translate in header_translations else True
+    info_lines = _INFO_BOX_LINES if poster_data['rally_name'].startswith("DE-DCR") else None
+    with tracer.span("raster_render"):
+        return raster_renderer.render_poster_png(poster_data, header_translations[translate], info_lines, scale)
+
+def render_poster(poster_data, translate, status_callback, renderer=None, cache=None, scale=1, backend='chromium'):
+    # Renders entirely in memory: the markup goes straight into the browser and the PNG
+    # comes back as bytes. Returns (png_bytes, poster_html, error). scale is the device
+    # scale factor, 2 gives a poster twice as wide and high; backend one of RENDER_BACKENDS.
+    if not poster_data:
+        return None, None, "Fehlende Posterdaten."
+    _check_backend(backend)
+    from disk_cache import get_default_render_cache
+    if cache is None:
+        cache = get_default_render_cache()
+    cache_key = _render_cache_key(cache, poster_data, translate, scale, backend)
+    with tracer.span("render_cache_lookup") as span:
+        cached = cache.get(cache_key)
+        span.set(hit=cached is not None)
+    if cached is not None:
+        status_callback("Poster aus dem Cache geladen.")
+        return cached[0], cached[1], None
+
+    poster_html = None
+    try:
+        status_callback("Erstelle HTML...")
+        with tracer.span("html_build"):
+            poster_html = build_poster_html(poster_data, translate)
+        if backend == 'raster':
+            status_callback("Erstelle PNG ohne Browser...")
+            png_bytes = render_raster_png(poster_data, translate, scale)
+        else:
+            status_callback("Erstelle PNG mit Playwright...")
+            if renderer is None:
+                renderer = get_default_renderer()
+            png_bytes = renderer.render_html(poster_html, status_callback, scale)
+    except Exception as e:
+        if poster_html is None:
+            return None, None, f"Fehler bei der HTML-Erstellung:\n{e}"
+        return None, poster_html, f"Fehler bei der PNG-Erstellung:\n{e}"
+    try:
+        cache.put(cache_key, png_bytes, poster_html)
+    except OSError:
+        pass # A full or read-only cache must not fail the poster
+    return png_bytes, poster_html, None
+
+
+def render_posters(jobs, status_callback, renderer=None, cache=None, scale=1, backend='chromium'):
+    # Several posters at once, e.g. every leg of a season or the German and English variant
+    # of a rally. jobs are (poster_data, translate) pairs; returns one (png_bytes,
+    # poster_html, error) per job, in order. Cache misses render concurrently as pages of
+    # one browser, and an error only affects its own poster.
+    _check_backend(backend)
+    from disk_cache import get_default_render_cache
+    if cache is None:
+        cache = get_default_render_cache()
+    results = [None] * len(jobs)
+    pending = [] # (index, cache_key, poster_html, label)
+    cache_hits = 0
+    for index, (poster_data, translate) in enumerate(jobs):
+        if not poster_data:
+            results[index] = (None, None, "Fehlende Posterdaten.")
+            continue
+        cache_key = _render_cache_key(cache, poster_data, translate, scale, backend)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            results[index] = (cached[0], cached[1], None)
+            cache_hits += 1
+            continue
+        label = tracer.current_poster() or poster_data.get('rally_name')
+        try:
+            with tracer.span("html_build", poster=label):
+                poster_html = build_poster_html(poster_data, translate)
+        except Exception as e:
+            results[index] = (None, None, f"Fehler bei der HTML-Erstellung:\n{e}")
+            continue
+        pending.append((index, cache_key, poster_html, label))
+
+    if cache_hits:
+        status_callback(f"{cache_hits} Poster aus dem Cache geladen.")
+    if pending and backend == 'raster':
+        status_callback(f"Erstelle {len(pending)} PNGs ohne Browser...")
+        rendered = []
+        for index, _, _, label in pending:
+            poster_data, translate = jobs[index]
             try:
-                browser = p.chromium.launch()
-            except Exception:
-                status_callback("Playwright Browser nicht gefunden. Installiere...")
-                print("Attempting to install Playwright browsers...")
-                os.system(f'"{sys.executable}" -m playwright install chromium')
-                status_callback("Browser installiert. Versuche erneut...")
-                browser = p.chromium.launch() # Try again
-
-            page = browser.new_page()
-            # Use file URI for local HTML
-            file_uri = 'file:///' + os.path.abspath(html_path).replace('\\', '/')
-            page.goto(file_uri, wait_until='load')
-            # page.set_content(poster_html) # Less reliable for complex CSS/fonts
-            # page.wait_for_load_state('networkidle') # Wait longer if needed
-            page.screenshot(path=save_path, full_page=True)
-            browser.close()
+                with tracer.poster(label):
+                    rendered.append((render_raster_png(poster_data, translate, scale), None))
+            except Exception as e:
+                rendered.append((None, e))
+    elif pending:
+        status_callback(f"Erstelle {len(pending)} PNGs mit Playwright...")
+        if renderer is None:
+            renderer = get_default_renderer()
+        rendered = renderer.render_many([job[2] for job in pending], status_callback, labels=[job[3] for job in pending], scale=scale)
+    if pending:
+        for (index, cache_key, poster_html, _), (png_bytes, error) in zip(pending, rendered):
+            if error is not None:
+                results[index] = (None, poster_html, f"Fehler bei der PNG-Erstellung:\n{error}")
+                continue
+            try:
+                cache.put(cache_key, png_bytes, poster_html)
+            except OSError:
+                pass # A full or read-only cache must not fail the poster
+            results[index] = (png_bytes, poster_html, None)
+    return results
+
+
+def create_poster_files(poster_data, save_path, translate, status_callback, renderer=None, write_html=True, cache=None, scale=1, image_options=None, backend='chromium'):
+    # image_options (poster_image.ImageOptions) re-encodes the capture: the first format is
+    # written to save_path, further formats and the thumbnail next to it
+    if not poster_data or not save_path:
+        return False, "Fehlende Daten oder Speicherpfad.", None
+
+    png_bytes, poster_html, error = render_poster(poster_data, translate, status_callback, renderer, cache, scale, backend)
+    if error:
+        return False, error, None
+    return save_poster_files(png_bytes, poster_html, save_path, status_callback, write_html, image_options)
+
+
+def save_poster_files(png_bytes, poster_html, save_path, status_callback, write_html=True, image_options=None):
+    # Writes a rendered poster; returns (success, message, html_path) like create_poster_files
+    html_path = os.path.splitext(save_path)[0] + ".html" if write_html else None
+    try:
+        if image_options is None or not needs_pillow(image_options):
+            with open(save_path, "wb") as f:
+                f.write(png_bytes)
+            saved_lines = [f"PNG: {save_path}"]
+        else:
+            status_callback("Kodiere Bilder...")
+            with tracer.span("image_encode", formats=",".join(image_options.formats)):
+                images = encode_images(png_bytes, image_options)
+            saved_lines = []
+            for image, image_path in zip(images, _image_paths(save_path, images)):
+                with open(image_path, "wb") as f:
+                    f.write(image.data)
+                saved_lines.append(f"{image.name.upper()}: {image_path} ({len(image.data) / 1024:.0f} KB, "
+                                   f"{image.width}x{image.height}, {image.encode_seconds * 1000:.0f} ms)")
+        if write_html:
+            status_callback("Speichere HTML...")
+            with open(html_path, "w", encoding="utf-8") as f:
+                f.write(poster_html)
         status_callback("PNG erfolgreich erstellt.")
-        return True, f"Poster gespeichert:\nPNG: {save_path}\nHTML: {html_path}", html_path
+        if write_html:
+            saved_lines.append(f"HTML: {html_path}")
+        return True, "Poster gespeichert:\n" + "\n".join(saved_lines), html_path
 
     except Exception as e:
         return False, f"Fehler beim Speichern oder PNG-Erstellung:\n{e}", html_path
 
 
+def _image_paths(save_path, images):
+    # The first image goes to save_path; others take its name with their own extension,
+    # suffixed with the format where two share one
+    base_name = os.path.splitext(save_path)[0]
+    paths = [save_path]
+    for image in images[1:]:
+        if image.name.startswith("thumbnail-"):
+            path = f"{base_name}-thumb{image.extension}"
+        else:
+            path = base_name + image.extension
+            if path in paths:
+                path = f"{base_name}-{image.name}{image.extension}"
+        paths.append(path)
+    return paths
+
+
+# --- Persistent Browser ---
+
+def available_memory_mb():
+    # Free physical memory in MB, None where it can't be determined
+    if sys.platform == 'win32':
+        import ctypes
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                        ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys / (1024 * 1024)
+        return None
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+class PosterRenderer:
+    # Keeps one Chromium instance alive across posters. Playwright objects are bound to
+    # the event loop that created them, so the browser lives on a dedicated thread with
+    # its own loop and every render is scheduled onto it; callers simply block on the result.
+    # Renders submitted from several threads (or via render_many) run as concurrent pages
+    # of that one browser: at most max_pages at a time, and while less than min_free_mb
+    # of memory is available, a new page waits until the others are done.
+
+    def __init__(self, max_pages=4, min_free_mb=512):
+        self.max_pages = max(1, max_pages)
+        self.min_free_mb = min_free_mb
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._launch_lock = None # asyncio.Lock, created on the renderer loop
+        self._page_slots = None # asyncio.Semaphore, likewise
+        self._open_pages = 0
+        self._playwright = None
+        self._browser = None
+
+    def start(self):
+        # Pre-warm: launch Chromium in the background without waiting for it
+        loop = self._ensure_thread()
+        asyncio.run_coroutine_threadsafe(self._ensure_browser(lambda message: None), loop)
+
+    def render_html(self, poster_html, status_callback, scale=1):
+        # Returns the full-page screenshot as PNG bytes
+        poster = tracer.current_poster() # The job runs on the renderer loop, not in this context
+        return self.run(self._screenshot_job(poster_html, poster, scale), status_callback)
+
+    def render_many(self, poster_htmls, status_callback, labels=None, scale=1):
+        # Renders all pages concurrently and returns one (png_bytes, error) per page, in
+        # order. A failing page only sets its own error.
+        loop = self._ensure_thread()
+        labels = labels or [tracer.current_poster()] * len(poster_htmls)
+        futures = [asyncio.run_coroutine_threadsafe(self._run_job(self._screenshot_job(poster_html, label, scale), status_callback, label), loop)
+                   for poster_html, label in zip(poster_htmls, labels)]
+        results = []
+        for future in futures:
+            try:
+                results.append((future.result(), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
+
+    def _screenshot_job(self, poster_html, poster, scale=1):
+        async def screenshot(browser):
+            async with self._page_slot():
+                page = await browser.new_page(device_scale_factor=scale)
+                try:
+                    with tracer.span("navigation", poster=poster):
+                        await page.set_content(poster_html, wait_until='load')
+                    with tracer.span("fonts", poster=poster):
+                        # 'load' covers the stylesheet but not necessarily the fonts
+                        await page.evaluate("document.fonts.ready.then(() => true)")
+                    with tracer.span("screenshot", poster=poster):
+                        return await page.screenshot(full_page=True)
+                finally:
+                    await page.close()
+        return screenshot
+
+    @contextlib.asynccontextmanager
+    async def _page_slot(self):
+        if self._page_slots is None:
+            self._page_slots = asyncio.Semaphore(self.max_pages)
+        async with self._page_slots:
+            # Memory guard: one page may always open, further ones wait for free memory
+            while self._open_pages and self.min_free_mb:
+                free_mb = available_memory_mb()
+                if free_mb is None or free_mb >= self.min_free_mb:
+                    break
+                await asyncio.sleep(0.25)
+            self._open_pages += 1
+            try:
+                yield
+            finally:
+                self._open_pages -= 1
+
+    def run(self, job, status_callback):
+        # Run `await job(browser)` on the renderer loop and return its result
+        loop = self._ensure_thread()
+        future = asyncio.run_coroutine_threadsafe(self._run_job(job, status_callback, tracer.current_poster()), loop)
+        return future.result()
+
+    def close(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if not thread or not thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=10)
+        except Exception:
+            pass # Browser may already be gone
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._launch_lock = None
+                self._page_slots = None
+                self._open_pages = 0
+                self._playwright = None
+                self._browser = None
+                self._thread = threading.Thread(target=self._run_loop, args=(self._loop,), name="PosterRenderer", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _run_loop(self, loop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _run_job(self, job, status_callback, poster=None):
+        browser = await self._ensure_browser(status_callback, poster)
+        try:
+            return await job(browser)
+        except Exception:
+            if browser.is_connected():
+                raise
+        # The browser died underneath us: relaunch once and retry
+        status_callback("Browser abgestürzt. Starte neu...")
+        browser = await self._ensure_browser(status_callback, poster)
+        return await job(browser)
+
+    async def _ensure_browser(self, status_callback, poster=None):
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass # Already disconnected
+                self._browser = None
+            with tracer.span("browser_launch", poster=poster):
+                from playwright.async_api import async_playwright
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                # Check if browsers are installed, install if necessary
+                try:
+                    self._browser = await self._playwright.chromium.launch()
+                except Exception:
+                    status_callback("Playwright Browser nicht gefunden. Installiere...")
+                    print("Attempting to install Playwright browsers...")
+                    command = f'"{sys.executable}" -m playwright install chromium'
+                    await asyncio.get_running_loop().run_in_executor(None, os.system, command)
+                    status_callback("Browser installiert. Versuche erneut...")
+                    self._browser = await self._playwright.chromium.launch() # Try again
+            return self._browser
+
+    async def _shutdown(self):
+        try:
+            if self._browser is not None:
+                await self._browser.close()
+        finally:
+            self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+_default_renderer = None
+_default_renderer_lock = threading.Lock()
+
+def get_default_renderer():
+    global _default_renderer
+    with _default_renderer_lock:
+        if _default_renderer is None:
+            _default_renderer = PosterRenderer()
+            atexit.register(_default_renderer.close)
+        return _default_renderer
+
+def set_default_renderer(renderer):
+    global _default_renderer
+    with _default_renderer_lock:
+        if _default_renderer is not None and _default_renderer is not renderer:
+            _default_renderer.close()
+        _default_renderer = renderer
+        atexit.register(renderer.close)
+
+
 # --- Tkinter GUI Application ---
 
+def preload_modules():
+    # Imports everything the first poster needs. Called on a background thread while the
+    # window is already visible; imports are thread-safe, so code that gets there first
+    # simply waits for the module.
+    import requests
+    import bs4
+    import playwright.async_api
+    import disk_cache
+    if _XPATH_TEXT is None:
+        _compile_xpaths()
+
 class RallyPosterApp:
-    def __init__(self, master):
+    def __init__(self, master, setup=None, exit_when_ready=False):
+        # setup runs on the preload thread before any page is fetched (cache configuration);
+        # exit_when_ready closes the window right after preloading, for --startup-time
         self.master = master
         master.title("Rally Poster Generator")
         master.geometry("600x250") # Adjusted size
@@ -343,6 +1208,9 @@ class RallyPosterApp:
         self.translate_var = tk.BooleanVar(value=True)
         self.status_var = tk.StringVar(value="Bereit.")
         self.last_save_dir = self._load_last_save_dir()
+        self.renderer = PosterRenderer()
+        self.current_url = None
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # --- Layout ---
         main_frame = ttk.Frame(master, padding="10 10 10 10")
@@ -376,6 +1244,35 @@ class RallyPosterApp:
         y = (master.winfo_screenheight() // 2) - (master.winfo_height() // 2)
         master.geometry(f'+{x}+{y}')
 
+        # Heavy imports start once the window is on screen
+        self.startup_marks = {}
+        self.modules_ready = threading.Event()
+        self._exit_when_ready = exit_when_ready
+        master.after_idle(self._start_preload, setup)
+
+    def _start_preload(self, setup):
+        self.startup_marks["first_paint"] = time.perf_counter()
+        threading.Thread(target=self._preload, args=(setup,), daemon=True).start()
+
+    def _preload(self, setup):
+        try:
+            if setup is not None:
+                setup()
+            preload_modules()
+        except Exception as e:
+            # e.g. a broken Playwright install; the same error surfaces again when it is used
+            print(f"Vorladen fehlgeschlagen: {e}")
+        finally:
+            self.startup_marks["preload_done"] = time.perf_counter()
+            self.modules_ready.set()
+        if self._exit_when_ready:
+            self.master.after(0, self.on_close)
+
+    def on_close(self):
+        # Shut Chromium down cleanly before the window goes away
+        self.renderer.close()
+        self.master.destroy()
+
     def create_context_menu(self, widget):
         menu = tk.Menu(widget, tearoff=0)
         menu.add_command(label="Cut", command=lambda: widget.event_generate("<<Cut>>"))
@@ -486,15 +1383,23 @@ class RallyPosterApp:
     def run_generation_process(self):
         url = self.url_var.get().strip()
         translate = self.translate_var.get()
+        self.current_url = url # Trace label for the file creation thread
+
+        if not self.modules_ready.is_set():
+            self.update_status("Lade Module...")
+            self.modules_ready.wait()
 
         # 1. Fetch HTML
-        html_content, error = fetch_html_content(url, self.update_status)
+        with tracer.poster(url):
+            html_content, error = fetch_html_content(url, self.update_status, decode=False)
         if error:
             self.show_error(error)
             return
 
-        # 2. Parse HTML to get data (including rally name for save dialog)
-        poster_data, error = generate_poster_data(html_content, translate, self.update_status)
+        # 2. Parse HTML to get data (including rally name for save dialog). The extraction
+        # is cached, so toggling the language and generating again doesn't parse again.
+        with tracer.poster(url):
+            poster_data, error = extract_poster_data_cached(html_content, self.update_status, url)
         if error:
             self.show_error(error)
             return
@@ -502,13 +1407,16 @@ class RallyPosterApp:
              self.show_error("Konnte keine Posterdaten extrahieren.")
              return
 
+        # Warm up the browser while the user picks the save path
+        self.renderer.start()
+
         # 3. Ask for Save Path (needs to run in main thread)
         self.master.after(0, self.ask_save_path_and_generate, poster_data, translate)
 
     def ask_save_path_and_generate(self, poster_data, translate):
         # This method is called via self.master.after, so it runs in the main GUI thread
         rally_name = poster_data.get('rally_name', 'poster')
-        safe_name = re.sub(r'[\\/*?:"<>|]', "_", rally_name).strip() + ".png"
+        safe_name = safe_filename(rally_name) + ".png"
         initial_file = safe_name
 
         save_path = filedialog.asksaveasfilename(
@@ -535,7 +1443,8 @@ class RallyPosterApp:
         thread.start()
 
     def run_file_creation(self, poster_data, save_path, translate):
-        success, message, html_path = create_poster_files(poster_data, save_path, translate, self.update_status)
+        with tracer.poster(self.current_url):
+            success, message, html_path = create_poster_files(poster_data, save_path, translate, self.update_status, renderer=self.renderer)
         if success:
             self.show_success(message, save_path, html_path)
         else:
@@ -548,9 +1457,270 @@ class RallyPosterApp:
                     pass # Ignore if removal fails
 
 
+# --- Batch Mode ---
+
+def safe_filename(rally_name):
+    return re.sub(r'[\\/*?:"<>|]', "_", rally_name).strip()
+
+def read_url_file(path):
+    urls = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'): # Allow blank lines and comments
+                urls.append(line)
+    return urls
+
+def english_path(save_path):
+    # Where the English poster goes when both languages are made
+    base_name, extension = os.path.splitext(save_path)
+    return f"{base_name}-en{extension}"
+
+def run_batch(urls, output_dir, translate=True, workers=4, status_callback=print, write_html=True, scale=1, image_options=None, backend='chromium',
+              both_languages=False):
+    # Pages are downloaded concurrently and parsed as they arrive; finished ones are handed
+    # to a pool that renders up to renderer.max_pages of them at once on the warm browser,
+    # so fetching, parsing and rendering overlap. both_languages makes the German poster
+    # and, next to it, the English one (see english_path); translate is ignored then.
+    os.makedirs(output_dir, exist_ok=True)
+    renderer = get_default_renderer()
+    if backend == 'chromium':
+        renderer.start() # Warm up while the first pages download
+
+    parsed = queue.Queue()
+    def produce():
+        try:
+            fetch_and_parse_many(urls, status_callback, lambda *result: parsed.put(result), max_per_host=max(1, workers))
+        finally:
+            parsed.put(None)
+    threading.Thread(target=produce, daemon=True).start()
+
+    def render(url, poster_data, save_path, result):
+        quiet = lambda message: None
+        with tracer.poster(url):
+            if not both_languages:
+                outcomes = [(save_path, create_poster_files(poster_data, save_path, translate, quiet, renderer=renderer,
+                                                            write_html=write_html, scale=scale, image_options=image_options, backend=backend))]
+            else:
+                # German and English of one rally render together, as pages of the one browser
+                save_paths = [save_path, english_path(save_path)]
+                rendered = render_posters([(poster_data, True), (poster_data, False)], quiet, renderer=renderer, scale=scale, backend=backend)
+                outcomes = []
+                for path, (png_bytes, poster_html, error) in zip(save_paths, rendered):
+                    if error:
+                        outcomes.append((path, (False, error, None)))
+                    else:
+                        outcomes.append((path, save_poster_files(png_bytes, poster_html, path, quiet, write_html, image_options)))
+        errors = [message for _, (success, message, _) in outcomes if not success]
+        result["ok"] = not errors
+        if not errors:
+            result["png_path"] = save_path
+            for path, (_, message, _) in outcomes:
+                status_callback(f"OK      {url} -> {path}")
+                if image_options is not None and needs_pillow(image_options):
+                    for line in message.splitlines()[1:]: # Size and encode time per image
+                        status_callback(f"          {line}")
+        else:
+            result["error"] = "\n".join(errors)
+            status_callback(f"FEHLER  {url}")
+
+    results = {}
+    futures = []
+    used_names = set()
+    extension = IMAGE_FORMATS[image_options.formats[0]][0] if image_options is not None else ".png"
+    render_pool = concurrent.futures.ThreadPoolExecutor(max_workers=renderer.max_pages, thread_name_prefix="BatchRender")
+    started = time.perf_counter()
+    while True:
+        item = parsed.get()
+        if item is None:
+            break
+        url, poster_data, error = item
+        result = {"url": url, "ok": False, "rally_name": None, "png_path": None, "error": None}
+        results[url] = result
+        if error:
+            result["error"] = error
+            status_callback(f"FEHLER  {url}")
+            continue
+
+        result["rally_name"] = poster_data['rally_name']
+        base_name = safe_filename(poster_data['rally_name']) or "poster"
+        file_name, n = base_name, 2
+        while file_name.lower() in used_names: # Same rally name twice in one batch
+            file_name = f"{base_name} ({n})"
+            n += 1
+        used_names.add(file_name.lower())
+        save_path = os.path.join(output_dir, file_name + extension)
+        futures.append((render_pool.submit(render, url, poster_data, save_path, result), result))
+    render_pool.shutdown(wait=True)
+    for future, result in futures:
+        exception = future.exception()
+        if exception is not None: # Raised outside create_poster_files' own error handling
+            result["ok"] = False
+            result["error"] = str(exception) or type(exception).__name__
+            status_callback(f"FEHLER  {result['url']}")
+    elapsed = time.perf_counter() - started
+
+    missing = {"ok": False, "rally_name": None, "png_path": None, "error": "Nicht verarbeitet."}
+    ordered = [results.get(url) or dict(missing, url=url) for url in dict.fromkeys(urls)]
+    succeeded = sum(1 for result in ordered if result["ok"])
+    status_callback("")
+    status_callback("Zusammenfassung:")
+    for result in ordered:
+        if result["ok"]:
+            status_callback(f"  OK      {result['rally_name']}: {result['png_path']}")
+        else:
+            error_line = (result["error"] or "").replace("\n", " ")
+            status_callback(f"  FEHLER  {result['url']}: {error_line}")
+    rate = succeeded / elapsed * 60 if elapsed > 0 else 0.0
+    status_callback(f"{succeeded}/{len(ordered)} Poster erfolgreich in {elapsed:.1f} s ({rate:.1f} Poster/min).")
+    from disk_cache import get_default_render_cache
+    render_stats = get_default_render_cache().stats()
+    status_callback(f"Render-Cache: {render_stats['hits']} Treffer, {render_stats['misses']} neu gerendert.")
+    return ordered
+
+
+def export_trace(path):
+    if not path:
+        return
+    try:
+        tracer.export(path)
+        print(f"Trace gespeichert: {os.path.abspath(path)} ({len(tracer.events())} Messpunkte)")
+    except OSError as e:
+        print(f"Trace konnte nicht gespeichert werden: {e}")
+
+def report_startup_time(marks, log_path=None):
+    # Milliseconds since the first line of this module ran. In the packaged exe the
+    # bootloader runs before that; started_at lets a launcher script add that part.
+    since_start = {name: round((mark - _process_started) * 1000, 1) for name, mark in marks.items()}
+    for name, milliseconds in since_start.items():
+        print(f"{name:<14} {milliseconds:8.1f} ms")
+    if log_path:
+        entry = {
+            "started_at": time.time() - (time.perf_counter() - _process_started),
+            "frozen": bool(getattr(sys, 'frozen', False)),
+            "python": sys.version.split()[0],
+            "marks_ms": since_start,
+        }
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        print(f"Startzeiten angehängt an: {os.path.abspath(log_path)}")
+
+def check_parsers(sources):
+    all_equal = True
+    for source in sources:
+        if source.startswith('http://') or source.startswith('https://'):
+            html_content, error = fetch_html_content(source, lambda message: None, decode=False)
+            if error:
+                print(f"FEHLER  {source}: {error}")
+                all_equal = False
+                continue
+        else:
+            with open(source, "rb") as f:
+                html_content = f.read()
+        report = compare_parsers(html_content)
+        all_equal = all_equal and report["equal"]
+        print(f"{'OK' if report['equal'] else 'ABWEICHUNG':<10} {source} ({len(html_content) // 1024} KB): "
+              f"BeautifulSoup {report['soup_seconds'] * 1000:.1f} ms / {report['soup_peak_kb']:.0f} KB Python-Heap, "
+              f"lxml {report['lxml_seconds'] * 1000:.1f} ms / {report['lxml_peak_kb']:.0f} KB Python-Heap")
+    return 0 if all_equal else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rally Poster Generator. Ohne URLs startet die grafische Oberfläche.")
+    parser.add_argument("urls", nargs="*", help="Rallye-URLs für den Stapelbetrieb")
+    parser.add_argument("-f", "--url-file", help="Datei mit einer Rallye-URL pro Zeile")
+    parser.add_argument("-o", "--output-dir", default=".", help="Zielordner für die Poster (Standard: aktueller Ordner)")
+    parser.add_argument("--no-translate", action="store_true", help="Poster auf Englisch erstellen")
+    parser.add_argument("--both-languages", action="store_true", help="Je Rallye ein deutsches und ein englisches Poster (Name-en) erstellen")
+    parser.add_argument("--no-html", action="store_true", help="Nur das PNG speichern, keine HTML-Datei")
+    parser.add_argument("-j", "--workers", type=int, default=4, help="Parallele Downloads pro Server (Standard: 4)")
+    parser.add_argument("--pages", type=int, default=4, help="Poster, die gleichzeitig im Browser gerendert werden (Standard: 4)")
+    parser.add_argument("--min-free-mb", type=float, default=512, help="Weitere Browser-Seiten erst öffnen, wenn so viel Arbeitsspeicher frei ist (Standard: 512)")
+    parser.add_argument("--backend", choices=RENDER_BACKENDS, default="chromium", help="chromium: Screenshot im Browser; raster: ohne Browser mit Pillow zeichnen, schneller und sparsamer (Standard: chromium)")
+    parser.add_argument("--scale", type=float, default=1, help="Gerätepixel je CSS-Pixel, 2 verdoppelt die Auflösung (Standard: 1)")
+    parser.add_argument("--format", default="png", help=f"Bildformate, kommagetrennt, das erste ist die Hauptdatei: {', '.join(IMAGE_FORMATS)} (Standard: png)")
+    parser.add_argument("--quality", type=int, default=85, help="Qualität für webp und jpeg, 1-100 (Standard: 85)")
+    parser.add_argument("--thumbnail", type=int, metavar="BREITE", help="Zusätzlich eine auf BREITE Pixel verkleinerte Vorschau speichern")
+    parser.add_argument("--cache-ttl", type=float, default=3600, help="Sekunden, die eine Rallye-Seite ohne Nachfrage aus dem Cache kommt (Standard: 3600)")
+    parser.add_argument("--cache-size", type=float, default=50, help="Maximale Größe des Seiten-Caches in MB (Standard: 50)")
+    parser.add_argument("--offline", action="store_true", help="Nur Seiten aus dem Cache verwenden")
+    parser.add_argument("--render-cache-size", type=float, default=200, help="Maximale Größe des Poster-Caches in MB, 0 schaltet ihn ab (Standard: 200)")
+    parser.add_argument("--trace", metavar="DATEI", help="Zeitmessung je Phase und Poster aufzeichnen (.jsonl oder Chrome-Trace .json)")
+    parser.add_argument("--startup-time", nargs="?", const="", metavar="DATEI", help="Startzeiten der Oberfläche messen und danach beenden; mit DATEI zusätzlich als JSON-Zeile anhängen")
+    parser.add_argument("--check-parser", action="store_true", help="lxml- und BeautifulSoup-Auswertung der angegebenen URLs oder HTML-Dateien vergleichen")
+    parser.add_argument("--serve", nargs="?", const="127.0.0.1:8765", metavar="ADRESSE", help="Als lokaler HTTP-Dienst laufen, der Poster als PNG liefert (Standard: 127.0.0.1:8765)")
+    parser.add_argument("--queue-size", type=int, default=16, help="Aufträge, die der HTTP-Dienst höchstens annimmt, bevor er mit 503 ablehnt (Standard: 16)")
+    args = parser.parse_args(argv)
+
+    def configure_caches():
+        from disk_cache import (ExtractionCache, HttpCache, RenderCache, set_default_extraction_cache, set_default_http_cache,
+                                set_default_render_cache)
+        set_default_http_cache(HttpCache(ttl=args.cache_ttl, max_bytes=int(args.cache_size * 1024 * 1024), offline=args.offline))
+        set_default_render_cache(RenderCache(max_bytes=int(args.render_cache_size * 1024 * 1024)))
+        set_default_extraction_cache(ExtractionCache())
+    tracer.enabled = bool(args.trace)
+    if not args.scale > 0:
+        parser.error("--scale muss größer als 0 sein.")
+    if args.thumbnail is not None and args.thumbnail <= 0:
+        parser.error("--thumbnail muss eine Breite größer als 0 sein.")
+    try:
+        image_options = ImageOptions(parse_formats(args.format), max(1, min(100, args.quality)), args.thumbnail)
+    except ValueError as e:
+        parser.error(str(e))
+    if needs_pillow(image_options) or args.backend == 'raster':
+        try:
+            import PIL
+        except ImportError:
+            parser.error("--backend raster, --format und --thumbnail brauchen Pillow (pip install Pillow).")
+        if args.backend == 'raster':
+            import raster_renderer
+            if not raster_renderer.pillow_supported():
+                version = '.'.join(map(str, raster_renderer.MIN_PILLOW_VERSION))
+                parser.error(f"--backend raster braucht Pillow {version} oder neuer (pip install -U Pillow).")
+    set_default_renderer(PosterRenderer(max_pages=args.pages, min_free_mb=args.min_free_mb))
+
+    urls = list(args.urls)
+    if args.url_file:
+        try:
+            urls += read_url_file(args.url_file)
+        except OSError as e:
+            parser.error(f"URL-Datei konnte nicht gelesen werden: {e}")
+
+    if args.check_parser:
+        configure_caches()
+        return check_parsers(urls)
+
+    if args.serve is not None:
+        import poster_server
+        configure_caches()
+        try:
+            return poster_server.serve(args.serve, max_queue=args.queue_size, renderer=get_default_renderer(), backend=args.backend)
+        finally:
+            get_default_renderer().close()
+            export_trace(args.trace)
+
+    if not urls:
+        measure_startup = args.startup_time is not None
+        marks = {"imports": _imports_done, "module": _module_loaded, "main": time.perf_counter()}
+        root = tk.Tk()
+        # The caches are configured on the preload thread, the window doesn't wait for them
+        app = RallyPosterApp(root, setup=configure_caches, exit_when_ready=measure_startup)
+        marks["window"] = time.perf_counter()
+        root.mainloop()
+        app.renderer.close()
+        export_trace(args.trace)
+        if measure_startup:
+            report_startup_time(dict(marks, **app.startup_marks), args.startup_time)
+        return 0
+
+    configure_caches()
+    results = run_batch(urls, args.output_dir, translate=not args.no_translate, workers=args.workers, write_html=not args.no_html,
+                        scale=args.scale, image_options=image_options, backend=args.backend, both_languages=args.both_languages)
+    export_trace(args.trace)
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+_module_loaded = time.perf_counter()
+
 if __name__ == "__main__":
-    # Command-line argument handling is removed as per the plan
-    # The application will now always start in GUI mode.
-    root = tk.Tk()
-    app = RallyPosterApp(root)
-    root.mainloop()
+    sys.exit(main())
@@ -1,12 +1,14 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+# One-folder build: the one-file variant unpacked the whole bundle into a temp directory
+# on every launch before the window could appear. Ship the dist/poster_generator folder.
 
 a = Analysis(
     ['poster_generator.py'],
     pathex=[],
     binaries=[],
-    datas=[],
-    hiddenimports=[],
+    datas=[('fonts', 'fonts')], # Bundled poster fonts, see poster_fonts.py
+    hiddenimports=['poster_server'], # Imported only for --serve
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -19,16 +21,13 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='poster_generator',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False, # Decompressing UPX-packed DLLs costs time on every start
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +35,12 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='poster_generator',
+)
@@ -0,0 +1,72 @@
+import collections
+import io
+import time
+
+# Output encodings of the captured poster. 'png' keeps Chromium's capture as it is, the
+# others re-encode it with Pillow. Name -> (file extension, Pillow format)
+IMAGE_FORMATS = {
+    'png': ('.png', 'PNG'),
+    'png-optimized': ('.png', 'PNG'), # Lossless, maximum zlib effort
+    'png-quantized': ('.png', 'PNG'), # 256 colours; the posters are flat colours and text
+    'webp': ('.webp', 'WEBP'),
+    'jpeg': ('.jpg', 'JPEG'),
+}
+
+# formats: names from IMAGE_FORMATS, the first one is the main file. quality applies to
+# webp and jpeg. thumbnail_width adds a downscaled copy in the first format.
+ImageOptions = collections.namedtuple('ImageOptions', 'formats quality thumbnail_width', defaults=(('png',), 85, None))
+
+# name is the format, prefixed with "thumbnail-" for the thumbnail
+EncodedImage = collections.namedtuple('EncodedImage', 'name extension data width height encode_seconds')
+
+
+def parse_formats(text):
+    # "webp,png-quantized" -> ('webp', 'png-quantized'); raises ValueError on unknown names
+    formats = tuple(dict.fromkeys(name.strip().lower() for name in text.split(',') if name.strip()))
+    unknown = [name for name in formats if name not in IMAGE_FORMATS]
+    if unknown or not formats:
+        raise ValueError(f"Unbekanntes Bildformat: {', '.join(unknown) or text!r}. Möglich: {', '.join(IMAGE_FORMATS)}")
+    return formats
+
+def needs_pillow(options):
+    return options.formats != ('png',) or bool(options.thumbnail_width)
+
+
+def encode_images(png_bytes, options):
+    # Encodes the one captured PNG into every requested variant. The capture is decoded
+    # once; each variant reports its size (len(data)) and encode time.
+    if not needs_pillow(options):
+        return [EncodedImage('png', '.png', png_bytes, None, None, 0.0)]
+    from PIL import Image
+    with Image.open(io.BytesIO(png_bytes)) as captured:
+        captured.load()
+        image = captured.convert('RGB') # The poster has an opaque background
+    results = []
+    for name in options.formats:
+        if name == 'png':
+            results.append(EncodedImage(name, '.png', png_bytes, image.width, image.height, 0.0))
+        else:
+            results.append(_encode(name, image, options.quality))
+    if options.thumbnail_width and options.thumbnail_width < image.width:
+        started = time.perf_counter()
+        height = max(1, round(image.height * options.thumbnail_width / image.width))
+        thumbnail = image.resize((options.thumbnail_width, height), Image.LANCZOS)
+        resize_seconds = time.perf_counter() - started
+        encoded = _encode(options.formats[0], thumbnail, options.quality)
+        results.append(encoded._replace(name="thumbnail-" + encoded.name, encode_seconds=encoded.encode_seconds + resize_seconds))
+    return results
+
+def _encode(name, image, quality):
+    from PIL import Image
+    extension, pillow_format = IMAGE_FORMATS[name]
+    started = time.perf_counter()
+    if name == 'png-quantized':
+        image = image.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+    buffer = io.BytesIO()
+    if pillow_format == 'PNG':
+        image.save(buffer, 'PNG', optimize=name != 'png', compress_level=9)
+    elif pillow_format == 'WEBP':
+        image.save(buffer, 'WEBP', quality=quality, method=4) # 6 compresses ~3% better at 3x the time
+    else:
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return EncodedImage(name, extension, buffer.getvalue(), image.width, image.height, time.perf_counter() - started)
@@ -0,0 +1,281 @@
+import collections
+import concurrent.futures
+import hashlib
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import poster_generator as pg
+from pipeline_trace import tracer
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 8 * 1024 * 1024 # A rally page is a few hundred KB
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class PosterError(Exception):
+    # A request that failed in one of the pipeline steps; status is the HTTP status to answer with
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PosterService:
+    # Turns poster requests into PNGs on a shared warm renderer. Requests wait in a bounded
+    # queue worked off by as many threads as the renderer renders pages at once; when the
+    # queue is full, submit() raises QueueFullError instead of piling up work. A request
+    # identical to one still queued or rendering gets that request's future.
+
+    def __init__(self, renderer=None, max_queue=16, workers=None, latency_window=500, backend='chromium'):
+        self.renderer = renderer or pg.get_default_renderer()
+        self.backend = backend
+        self.max_queue = max_queue
+        self._jobs = queue.Queue(maxsize=max(1, max_queue))
+        self._lock = threading.Lock()
+        self._in_flight = {} # key -> Future, from submit until the result is set
+        self._rendering = 0
+        self._latencies = collections.deque(maxlen=latency_window)
+        self._counters = collections.Counter()
+        self._workers = [threading.Thread(target=self._work, name=f"PosterService-{n}", daemon=True)
+                         for n in range(workers or self.renderer.max_pages)]
+        for worker in self._workers:
+            worker.start()
+        if backend == 'chromium':
+            self.renderer.start()
+
+    def submit(self, url=None, html=None, translate=True):
+        # Exactly one of url (rally page to fetch) and html (the rally page itself).
+        # Returns a concurrent.futures.Future resolving to the PNG bytes or raising PosterError.
+        if (url is None) == (html is None):
+            raise ValueError("Entweder url oder html angeben.")
+        if url is not None:
+            key = ('url', url, bool(translate))
+        else:
+            # A str page (JSON body) goes to the parser as is; only the key needs bytes
+            page_bytes = html.encode('utf-8') if isinstance(html, str) else html
+            key = ('html', hashlib.sha256(page_bytes).hexdigest(), bool(translate))
+        with self._lock:
+            self._counters['requests'] += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._counters['deduplicated'] += 1
+                return future
+            future = concurrent.futures.Future()
+            try:
+                self._jobs.put_nowait((key, url, html, bool(translate), future, time.perf_counter()))
+            except queue.Full:
+                self._counters['rejected'] += 1
+                raise QueueFullError(f"Warteschlange voll ({self.max_queue} Aufträge).") from None
+            self._in_flight[key] = future
+        return future
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = dict(self._counters)
+            in_flight = len(self._in_flight)
+            rendering = self._rendering
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 1)
+        return {
+            "queue_depth": self._jobs.qsize(),
+            "queue_capacity": self.max_queue,
+            "rendering": rendering,
+            "in_flight": in_flight,
+            "requests": counters.get('requests', 0),
+            "completed": counters.get('completed', 0),
+            "failed": counters.get('failed', 0),
+            "rejected": counters.get('rejected', 0),
+            "deduplicated": counters.get('deduplicated', 0),
+            "latency_ms": {"samples": len(latencies), "p50": percentile(0.5), "p95": percentile(0.95),
+                           "max": round(latencies[-1] * 1000, 1) if latencies else None},
+        }
+
+    def _work(self):
+        while True:
+            key, url, html, translate, future, queued_at = self._jobs.get()
+            with self._lock:
+                self._rendering += 1
+            try:
+                with tracer.poster(url or f"html:{key[1][:12]}"):
+                    png_bytes = self._produce(url, html, translate)
+            except Exception as e:
+                if not isinstance(e, PosterError):
+                    e = PosterError(500, f"Ein unerwarteter Fehler ist aufgetreten:\n{e}")
+                outcome = ('failed', e)
+            else:
+                outcome = ('completed', png_bytes)
+            with self._lock:
+                self._rendering -= 1
+                del self._in_flight[key] # Later identical requests start a fresh render (or hit the render cache)
+                self._counters[outcome[0]] += 1
+                self._latencies.append(time.perf_counter() - queued_at)
+            if outcome[0] == 'completed':
+                future.set_result(outcome[1])
+            else:
+                future.set_exception(outcome[1])
+
+    def _produce(self, url, html, translate):
+        quiet = lambda message: None
+        if url is not None:
+            html, error = pg.fetch_html_content(url, quiet, decode=False)
+            if error:
+                raise PosterError(502 if url.startswith(('http://', 'https://')) else 400, error)
+        poster_data, error = pg.extract_poster_data_cached(html, quiet, url) # Shared by both languages
+        if error:
+            raise PosterError(422, error)
+        png_bytes, _, error = pg.render_poster(poster_data, translate, quiet, renderer=self.renderer, backend=self.backend)
+        if error:
+            raise PosterError(500, error)
+        return png_bytes
+
+
+class PosterRequestHandler(BaseHTTPRequestHandler):
+    # GET  /poster?url=...&translate=0|1      PNG of a rally page fetched by the server
+    # POST /poster                            JSON {"url": ...} or {"html": ...}, optional "translate",
+    #                                         or the rally page itself as text/html (?translate=0|1)
+    # GET  /metrics                           queue depth, counters and latency percentiles as JSON
+    # GET  /health
+    server_version = "RSFPosterServer/1.0"
+    request_timeout = 120
+
+    def do_GET(self):
+        path, query = self._split_path()
+        if path == '/health':
+            self._send_json(200, {"status": "ok"})
+        elif path == '/metrics':
+            self._send_json(200, self.server.service.metrics())
+        elif path == '/poster':
+            self._answer_poster(url=_first(query, 'url'), translate=_parse_flag(_first(query, 'translate'), True))
+        else:
+            self._send_json(404, {"error": "Unbekannter Pfad."})
+
+    def do_POST(self):
+        path, query = self._split_path()
+        if path != '/poster':
+            self._send_json(404, {"error": "Unbekannter Pfad."})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json(400, {"error": "Ungültige Content-Length."})
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": f"Anfrage größer als {MAX_BODY_BYTES // (1024 * 1024)} MB."})
+            return
+        body = self.rfile.read(length)
+        translate = _parse_flag(_first(query, 'translate'), True)
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if content_type == 'application/json':
+            try:
+                request = json.loads(body.decode('utf-8'))
+            except (UnicodeDecodeError, ValueError) as e:
+                self._send_json(400, {"error": f"Ungültiges JSON: {e}"})
+                return
+            if not isinstance(request, dict):
+                self._send_json(400, {"error": "JSON-Objekt erwartet."})
+                return
+            url, html = request.get('url'), request.get('html')
+            for name, value in (('url', url), ('html', html)):
+                if value is not None and not isinstance(value, str):
+                    self._send_json(400, {"error": f"'{name}' muss ein Text sein."})
+                    return
+            self._answer_poster(url=url, html=html,
+                                translate=_parse_flag(request.get('translate'), translate))
+        else:
+            self._answer_poster(html=body, translate=translate)
+
+    def _answer_poster(self, url=None, html=None, translate=True):
+        if (url is None) == (html is None):
+            self._send_json(400, {"error": "Entweder url oder html angeben."})
+            return
+        started = time.perf_counter()
+        try:
+            future = self.server.service.submit(url=url, html=html, translate=translate)
+            png_bytes = future.result(timeout=self.request_timeout)
+        except QueueFullError as e:
+            self._send_json(503, {"error": str(e)}, {"Retry-After": "5"})
+            return
+        except PosterError as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+        except concurrent.futures.TimeoutError:
+            self._send_json(504, {"error": f"Keine Antwort nach {self.request_timeout} s."})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(png_bytes)))
+        self.send_header('X-Render-Time-Ms', f"{(time.perf_counter() - started) * 1000:.0f}")
+        self.end_headers()
+        self.wfile.write(png_bytes)
+
+    def _split_path(self):
+        parts = urlsplit(self.path)
+        return parts.path.rstrip('/') or '/', parse_qs(parts.query)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def _first(query, name):
+    values = query.get(name)
+    return values[0] if values else None
+
+def _parse_flag(value, default):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ('0', 'false', 'no', 'nein', 'en', '')
+
+
+class PosterServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service, verbose=False):
+        super().__init__(address, PosterRequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def parse_address(address):
+    # "host:port", ":port", "port" or "host"
+    host, _, port = address.rpartition(':') if ':' in address else ('', '', address)
+    if not port.isdigit():
+        host, port = address, ''
+    return host or DEFAULT_HOST, int(port) if port else DEFAULT_PORT
+
+def serve(address=f"{DEFAULT_HOST}:{DEFAULT_PORT}", max_queue=16, renderer=None, verbose=True, backend='chromium'):
+    service = PosterService(renderer, max_queue=max_queue, backend=backend)
+    server = PosterServer(parse_address(address), service, verbose=verbose)
+    host, port = server.server_address[:2]
+    print(f"Poster-Server läuft auf http://{host}:{port}/ (Warteschlange: {max_queue}, Seiten: {service.renderer.max_pages}). Beenden mit Strg+C.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
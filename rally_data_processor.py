@@ -1,6 +1,17 @@
+import collections
 import csv
+import hashlib
+import itertools
+import json
+import operator
+import os
 import re
 
+try:
+    import numpy as np
+except ImportError: # Optional, validation falls back to plain loops
+    np = None
+
 def parse_time_to_seconds(time_str):
     if not time_str:
         return None
@@ -29,138 +40,329 @@ def normalize_name_casing(name):
         return name
     return name[0].upper() + name[1:]
 
-def load_csv(file_content):
-    reader = csv.DictReader(file_content.splitlines(), delimiter=';')
-    data = []
-    for row in reader:
-        processed_row = {k.strip(): v.strip() for k, v in row.items()}
+# Name columns of the stages (User name/Real name) and final (user_name/real_name) exports
+NAME_COLUMNS = ('User name', 'Real name', 'user_name', 'real_name')
+
+def iter_csv(source, delimiter=';'):
+    # Yields the rows one at a time, so memory stays flat however long the export is.
+    # source is a file path, an open text file or any other iterable of lines.
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='utf-8', newline='') as f:
+            yield from _iter_rows(f, delimiter)
+    else:
+        yield from _iter_rows(source, delimiter)
+
+def _iter_rows(lines, delimiter):
+    reader = csv.reader(lines, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    # Column names are stripped and the name columns looked up once, not per row
+    columns = [column.strip() for column in header]
+    width = len(columns)
+    name_indexes = [i for i, column in enumerate(columns) if column in NAME_COLUMNS]
+    for values in reader:
+        if not values:
+            continue # Blank line
+        values = [value.strip() for value in values[:width]] # Surplus fields are dropped
+        if len(values) < width:
+            values.extend([''] * (width - len(values)))
         # Normalize casing for User name and Real name upon loading
-        if 'User name' in processed_row:
-            processed_row['User name'] = normalize_name_casing(processed_row['User name'])
-        if 'Real name' in processed_row:
-            processed_row['Real name'] = normalize_name_casing(processed_row['Real name'])
-        if 'user_name' in processed_row:
-            processed_row['user_name'] = normalize_name_casing(processed_row['user_name'])
-        if 'real_name' in processed_row:
-            processed_row['real_name'] = normalize_name_casing(processed_row['real_name'])
-        data.append(processed_row)
-    return data
+        for i in name_indexes:
+            values[i] = normalize_name_casing(values[i])
+        yield dict(zip(columns, values))
+
+def load_csv(file_content):
+    # Whole file content as one string, as plain row dicts. The validators and the report
+    # take records; use load_stage_results_from_text/load_final_results_from_text for those.
+    return list(_iter_rows(file_content.splitlines(), ';'))
+
+class StageResult:
+    # One row of the stages export. Times, SS number and penalty are parsed once here;
+    # the raw strings are kept where validation messages or the report print them.
+    # Columns missing from the file are stored as None.
+    __slots__ = ('ss', 'ss_text', 'stage_name', 'user_name', 'real_name', 'time1', 'time2', 'time3',
+                 'seconds', 'time_valid', 'progress', 'finished', 'penalty', 'penalty_seconds', 'comment',
+                 'well_formed')
+
+    def __init__(self, row):
+        self.ss_text = row.get('SS')
+        self.ss = _parse_int(self.ss_text)
+        self.stage_name = row.get('Stage name')
+        self.user_name = row.get('User name')
+        self.real_name = row.get('Real name')
+        self.time1 = row.get('time1')
+        self.time2 = row.get('time2')
+        self.time3 = row.get('time3')
+        self.seconds, self.time_valid = _parse_time(self.time3)
+        self.progress = row.get('Progress')
+        self.finished = self.progress == 'F'
+        self.penalty = row.get('Penalty')
+        self.penalty_seconds = _parse_float(self.penalty)
+        self.comment = row.get('Comment')
+        # False if _stage_row_errors reports anything besides a duplicate, see the columnar validation
+        self.well_formed = bool(self.ss_text and self.stage_name and self.user_name
+                                and self.ss is not None and self.ss > 0
+                                and (self.time3 and self.time_valid if self.finished else self.progress == '' and not self.time3))
+
+class FinalResult:
+    # One row of the final standings export, see StageResult
+    __slots__ = ('rank', 'rank_text', 'user_name', 'real_name', 'time3', 'seconds', 'time_valid', 'well_formed')
+
+    def __init__(self, row):
+        self.rank_text = row.get('#')
+        self.rank = _parse_int(self.rank_text)
+        self.user_name = row.get('user_name')
+        self.real_name = row.get('real_name')
+        self.time3 = row.get('time3')
+        self.seconds, self.time_valid = _parse_time(self.time3)
+        # False if _final_row_errors reports anything besides a duplicate
+        self.well_formed = bool(self.rank_text and self.user_name and self.real_name and self.time3
+                                and self.rank is not None and self.rank > 0 and self.time_valid)
+
+def _parse_int(text):
+    try:
+        return int(text)
+    except (ValueError, TypeError):
+        return None
+
+def _parse_float(text):
+    try:
+        return float(text)
+    except (ValueError, TypeError):
+        return None
+
+def _parse_time(text):
+    # (seconds, valid); an empty time is valid and has no seconds
+    if not text:
+        return None, True
+    try:
+        return parse_time_to_seconds(text), True
+    except ValueError:
+        return None, False
+
+def load_stage_results(source):
+    # source as for iter_csv
+    return [StageResult(row) for row in iter_csv(source)]
+
+def load_final_results(source):
+    return [FinalResult(row) for row in iter_csv(source)]
+
+def load_stage_results_from_text(file_content):
+    # Whole file content as one string, for callers that already have it in memory
+    # (a str passed to load_stage_results is a file path)
+    return [StageResult(row) for row in _iter_rows(file_content.splitlines(), ';')]
+
+def load_final_results_from_text(file_content):
+    return [FinalResult(row) for row in _iter_rows(file_content.splitlines(), ';')]
+
+# Row count from which validation switches to the NumPy column checks; below that the
+# plain loop, which skips well-formed rows, is at least as fast as building the arrays
+COLUMNAR_MIN_ROWS = 5000
 
 def validate_stages_data(stages_data):
+    # stages_data: StageResult records
+    stages_data = list(stages_data)
+    if np is not None and len(stages_data) >= COLUMNAR_MIN_ROWS:
+        errors = _validate_stages_columnar(stages_data)
+        if errors is not None:
+            return errors
+    return _check_stage_rows(stages_data, 0, set())
+
+def _check_stage_rows(rows, first_index, seen_stages):
+    # Errors of rows[first_index:]; seen_stages holds the (user, SS) keys of the rows
+    # before and is updated in place
     errors = []
-    seen_stages = {} # To check for sequential SS and duplicates
-
-    for i, row in enumerate(stages_data):
-        row_num = i + 2 # Account for header row
-
-        # Check for essential columns, allowing time3 and Progress to be empty for retirements
-        required_cols_always_present = ['SS', 'Stage name', 'User name']
-        for col in required_cols_always_present:
-            if col not in row or not row[col]:
-                errors.append(f"Stages file, Row {row_num}: Missing or empty value in column '{col}'.")
-
-        # Validate SS number
-        try:
-            ss_num = int(row['SS'])
-            if ss_num <= 0:
-                errors.append(f"Stages file, Row {row_num}: 'SS' must be a positive integer.")
-            
-            user_stage_key = (row.get('User name'), ss_num)
-            if user_stage_key in seen_stages:
-                errors.append(f"Stages file, Row {row_num}: Duplicate entry for User '{row.get('User name')}' on SS {ss_num}.")
-            seen_stages[user_stage_key] = True
-
-        except (ValueError, TypeError):
-            errors.append(f"Stages file, Row {row_num}: 'SS' is not a valid integer.")
-
-        # Validate time3 and Progress based on retirement rules
-        time3_val = row.get('time3')
-        progress_val = row.get('Progress')
-
-        if progress_val == 'F': # Driver finished stage
-            if not time3_val:
-                errors.append(f"Stages file, Row {row_num}: 'Progress' is 'F' but 'time3' is missing. Inconsistent finish status.")
-            else:
-                try:
-                    parse_time_to_seconds(time3_val)
-                except ValueError:
-                    errors.append(f"Stages file, Row {row_num}: 'time3' has an invalid format ('{time3_val}'). Expected mm:ss.sss or seconds.")
-        elif progress_val == '': # Driver retired in this stage
-            if time3_val:
-                errors.append(f"Stages file, Row {row_num}: 'Progress' is empty but 'time3' is present. Inconsistent retirement status.")
-            # No need to check time1/time2/time3 for presence here, as per rules they can be empty for retirements.
-        else:
-            errors.append(f"Stages file, Row {row_num}: 'Progress' has an invalid value ('{progress_val}'). Expected 'F' or empty.")
+    for i in range(first_index, len(rows)):
+        row = rows[i]
+        duplicate = False
+        if row.ss is not None:
+            user_stage_key = (row.user_name, row.ss)
+            duplicate = user_stage_key in seen_stages
+            seen_stages.add(user_stage_key)
+        if duplicate or not row.well_formed:
+            errors.extend(_stage_row_errors(row, i + 2, duplicate)) # Row numbers account for the header row
+    return errors
+
+def _stage_row_errors(row, row_num, duplicate):
+    errors = []
+
+    # Check for essential columns, allowing time3 and Progress to be empty for retirements
+    for col, value in (('SS', row.ss_text), ('Stage name', row.stage_name), ('User name', row.user_name)):
+        if not value:
+            errors.append(f"Stages file, Row {row_num}: Missing or empty value in column '{col}'.")
+
+    # Validate SS number
+    if row.ss is None:
+        errors.append(f"Stages file, Row {row_num}: 'SS' is not a valid integer.")
+    else:
+        if row.ss <= 0:
+            errors.append(f"Stages file, Row {row_num}: 'SS' must be a positive integer.")
+        if duplicate:
+            errors.append(f"Stages file, Row {row_num}: Duplicate entry for User '{row.user_name}' on SS {row.ss}.")
+
+    # Validate time3 and Progress based on retirement rules
+    if row.finished: # Driver finished stage
+        if not row.time3:
+            errors.append(f"Stages file, Row {row_num}: 'Progress' is 'F' but 'time3' is missing. Inconsistent finish status.")
+        elif not row.time_valid:
+            errors.append(f"Stages file, Row {row_num}: 'time3' has an invalid format ('{row.time3}'). Expected mm:ss.sss or seconds.")
+    elif row.progress == '': # Driver retired in this stage
+        if row.time3:
+            errors.append(f"Stages file, Row {row_num}: 'Progress' is empty but 'time3' is present. Inconsistent retirement status.")
+        # No need to check time1/time2/time3 for presence here, as per rules they can be empty for retirements.
+    else:
+        errors.append(f"Stages file, Row {row_num}: 'Progress' has an invalid value ('{row.progress}'). Expected 'F' or empty.")
 
     return errors
 
 def validate_final_data(final_data):
+    # final_data: FinalResult records
+    final_data = list(final_data)
+    if np is not None and len(final_data) >= COLUMNAR_MIN_ROWS:
+        errors = _validate_final_columnar(final_data)
+        if errors is not None:
+            return errors
+    seen_ranks = set() # To check for sequential # and duplicates
+    errors = _check_final_rows(final_data, 0, seen_ranks, set())
+    errors.extend(_rank_gaps(seen_ranks))
+    return errors
+
+def _check_final_rows(rows, first_index, seen_ranks, seen_users):
+    # Errors of rows[first_index:] except rank gaps; the seen sets are updated in place
     errors = []
-    seen_ranks = {} # To check for sequential # and duplicates
-    seen_users = set() # To check for duplicate users
-
-    for i, row in enumerate(final_data):
-        row_num = i + 2 # Account for header row
-
-        # Check for essential columns
-        required_cols = ['#', 'user_name', 'real_name', 'time3']
-        for col in required_cols:
-            if col not in row or not row[col]:
-                errors.append(f"Final file, Row {row_num}: Missing or empty value in column '{col}'.")
-
-        # Validate rank
-        try:
-            rank = int(row['#'])
-            if rank <= 0:
-                errors.append(f"Final file, Row {row_num}: '#' must be a positive integer.")
-            if rank in seen_ranks:
-                errors.append(f"Final file, Row {row_num}: Duplicate rank '{rank}'.")
-            seen_ranks[rank] = True
-        except (ValueError, TypeError):
-            errors.append(f"Final file, Row {row_num}: '#' is not a valid integer.")
-
-        # Validate user_name uniqueness
-        user_name = row.get('user_name')
-        if user_name:
-            if user_name in seen_users:
-                errors.append(f"Final file, Row {row_num}: Duplicate 'user_name' ('{user_name}').")
-            seen_users.add(user_name)
-
-        # Validate time3 format
-        if 'time3' in row and row['time3']:
-            try:
-                # Attempt to parse time3 to seconds to ensure it's a valid time
-                parse_time_to_seconds(row['time3'])
-            except ValueError:
-                errors.append(f"Final file, Row {row_num}: 'time3' has an invalid format ('{row['time3']}'). Expected mm:ss.sss or seconds.")
-    
+    for i in range(first_index, len(rows)):
+        row = rows[i]
+        duplicate_rank = False
+        if row.rank is not None:
+            duplicate_rank = row.rank in seen_ranks
+            seen_ranks.add(row.rank)
+        duplicate_user = False
+        if row.user_name:
+            duplicate_user = row.user_name in seen_users
+            seen_users.add(row.user_name)
+        if duplicate_rank or duplicate_user or not row.well_formed:
+            errors.extend(_final_row_errors(row, i + 2, duplicate_rank, duplicate_user)) # Row numbers account for the header row
+    return errors
+
+def _rank_gaps(seen_ranks):
     # Check for gaps in ranks
-    if seen_ranks:
-        max_rank = max(seen_ranks.keys())
-        for r in range(1, max_rank + 1):
-            if r not in seen_ranks:
-                errors.append(f"Final file: Gap in ranks, rank {r} is missing.")
+    if not seen_ranks:
+        return []
+    max_rank = max(seen_ranks)
+    return _rank_gap_errors(r for r in range(1, max_rank + 1) if r not in seen_ranks)
+
+def _final_row_errors(row, row_num, duplicate_rank, duplicate_user):
+    errors = []
+
+    # Check for essential columns
+    for col, value in (('#', row.rank_text), ('user_name', row.user_name), ('real_name', row.real_name), ('time3', row.time3)):
+        if not value:
+            errors.append(f"Final file, Row {row_num}: Missing or empty value in column '{col}'.")
+
+    # Validate rank
+    if row.rank is None:
+        errors.append(f"Final file, Row {row_num}: '#' is not a valid integer.")
+    else:
+        if row.rank <= 0:
+            errors.append(f"Final file, Row {row_num}: '#' must be a positive integer.")
+        if duplicate_rank:
+            errors.append(f"Final file, Row {row_num}: Duplicate rank '{row.rank}'.")
+
+    # Validate user_name uniqueness
+    if duplicate_user:
+        errors.append(f"Final file, Row {row_num}: Duplicate 'user_name' ('{row.user_name}').")
+
+    # Validate time3 format
+    if not row.time_valid:
+        errors.append(f"Final file, Row {row_num}: 'time3' has an invalid format ('{row.time3}'). Expected mm:ss.sss or seconds.")
+
+    return errors
+
+def _rank_gap_errors(missing_ranks):
+    return [f"Final file: Gap in ranks, rank {r} is missing." for r in missing_ranks]
 
+# --- Columnar validation ---
+# Same checks as the loops above, run over whole columns: the row-local checks were already
+# folded into well_formed at load time, duplicates and rank gaps are found with NumPy. Only
+# offending rows are handed to _stage_row_errors/_final_row_errors, so the messages and
+# their order are exactly those of the loops. Returns None when an SS or rank doesn't fit
+# into 64 bits; the caller then uses the loop.
+
+def _column(rows, name):
+    return list(map(operator.attrgetter(name), rows))
+
+def _int_column(values):
+    # (int64 array with 0 for None, mask of the rows that have a value)
+    values = np.array(values, dtype=object)
+    present = np.not_equal(values, None).astype(bool)
+    values[~present] = 0
+    try:
+        return values.astype(np.int64), present
+    except OverflowError:
+        return None, None
+
+def _codes(values):
+    # Dense integer code per distinct value, None included
+    codes = {}
+    return np.fromiter(map(codes.setdefault, values, itertools.count()), dtype=np.int64, count=len(values))
+
+def _later_duplicates(mask, *keys):
+    # True for rows within mask whose key tuple already occurred in an earlier row of mask
+    duplicates = np.zeros(len(mask), dtype=bool)
+    rows = np.flatnonzero(mask)
+    if len(rows) < 2:
+        return duplicates
+    order = rows[np.lexsort(tuple(key[rows] for key in reversed(keys)))] # Stable: ties keep row order
+    same = np.ones(len(order) - 1, dtype=bool)
+    for key in keys:
+        sorted_key = key[order]
+        same &= sorted_key[1:] == sorted_key[:-1]
+    duplicates[order[1:][same]] = True
+    return duplicates
+
+def _validate_stages_columnar(stages_data):
+    ss, has_ss = _int_column(_column(stages_data, 'ss'))
+    if ss is None:
+        return None
+    duplicate = _later_duplicates(has_ss, _codes(_column(stages_data, 'user_name')), ss)
+    offending = ~np.array(_column(stages_data, 'well_formed'), dtype=bool) | duplicate
+
+    errors = []
+    for i in np.flatnonzero(offending).tolist():
+        errors.extend(_stage_row_errors(stages_data[i], i + 2, duplicate[i]))
+    return errors
+
+def _validate_final_columnar(final_data):
+    rank, has_rank = _int_column(_column(final_data, 'rank'))
+    if rank is None:
+        return None
+    user_names = _column(final_data, 'user_name')
+    duplicate_rank = _later_duplicates(has_rank, rank)
+    duplicate_user = _later_duplicates(np.array(user_names, dtype=object).astype(bool), _codes(user_names))
+    offending = ~np.array(_column(final_data, 'well_formed'), dtype=bool) | duplicate_rank | duplicate_user
+
+    errors = []
+    for i in np.flatnonzero(offending).tolist():
+        errors.extend(_final_row_errors(final_data[i], i + 2, duplicate_rank[i], duplicate_user[i]))
+
+    # Check for gaps in ranks
+    positive_ranks = rank[has_rank & (rank >= 1)]
+    if len(positive_ranks):
+        seen = np.zeros(positive_ranks.max() + 1, dtype=bool)
+        seen[positive_ranks] = True
+        errors.extend(_rank_gap_errors((np.flatnonzero(~seen[1:]) + 1).tolist()))
     return errors
 
 def cross_validate_data(stages_data, final_data):
+    # Get all unique drivers from stages data and from final data
+    return _cross_errors(_drivers(stages_data), _drivers(final_data))
+
+def _drivers(rows):
+    return {(row.user_name, row.real_name) for row in rows if row.user_name and row.real_name}
+
+def _cross_errors(stages_drivers, final_drivers):
     errors = []
-    
-    # Get all unique drivers from stages data
-    stages_drivers = set()
-    for row in stages_data:
-        user_name = row.get('User name')
-        real_name = row.get('Real name')
-        if user_name and real_name:
-            stages_drivers.add((user_name, real_name))
-    
-    # Get all unique drivers from final data
-    final_drivers = set()
-    for row in final_data:
-        user_name = row.get('user_name')
-        real_name = row.get('real_name')
-        if user_name and real_name:
-            final_drivers.add((user_name, real_name))
 
     # Check if all drivers in final are also in stages
     for user_name, real_name in final_drivers:
@@ -171,9 +373,365 @@ def cross_validate_data(stages_data, final_data):
     # This is more complex as a driver might retire before the final stage.
     # For now, just check if names match.
 
-    # Casing is now handled during load_csv, so no need for explicit casing checks here.
+    # Casing is now handled while loading, so no need for explicit casing checks here.
     return errors
 
+# Result of IncrementalValidator.validate. stage_rows/final_rows are the CSV row numbers
+# (header = row 1) checked in this run; *_full_pass tells whether earlier rows had changed.
+IncrementalResult = collections.namedtuple('IncrementalResult', 'errors stage_rows final_rows stages_full_pass final_full_pass')
+
+# Validator state is kept in a JSON file next to each export, so a re-run of the script
+# after the next export only checks the appended rows. Bump when the stored state changes.
+SIDECAR_SUFFIX = '.validation.json'
+SIDECAR_VERSION = 1
+
+def _row_digests(rows):
+    # Stable across processes (unlike hash()), the digests are stored in the sidecar
+    return [hashlib.blake2b(repr(tuple(getattr(row, name) for name in row.__slots__)).encode('utf-8'), digest_size=8).hexdigest()
+            for row in rows]
+
+def _read_sidecar(source_path):
+    # Stored state of one export, or None if there is none or it belongs to another file
+    try:
+        with open(source_path + SIDECAR_SUFFIX, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get('version') != SIDECAR_VERSION or state.get('source') != os.path.abspath(source_path):
+        return None
+    return state
+
+def _write_sidecar(source_path, state):
+    # Best effort: without a writable folder the next run simply does a full pass
+    path = source_path + SIDECAR_SUFFIX
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    state = dict(state, version=SIDECAR_VERSION, source=os.path.abspath(source_path))
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+class IncrementalValidator:
+    # For exports that keep growing during a rolling event: remembers the rows it has
+    # checked together with the (user, SS) keys, ranks and drivers seen so far, so a
+    # re-run only checks the appended rows. If an earlier row was changed or removed,
+    # that file gets a full pass. The errors are the same as from the three validate
+    # functions, in the same order. load()/save() keep the state in sidecar files next
+    # to the exports, so this works across runs of the script.
+
+    def __init__(self):
+        self._reset_stages()
+        self._reset_final()
+
+    def _reset_stages(self):
+        self._stage_digests = []
+        self._stage_errors = []
+        self._seen_stages = set()
+        self._stage_drivers = set()
+
+    def _reset_final(self):
+        self._final_digests = []
+        self._final_errors = []
+        self._seen_ranks = set()
+        self._seen_users = set()
+        self._final_drivers = set()
+
+    @classmethod
+    def load(cls, stages_path, final_path):
+        # Validator with the state saved for these two exports; parts without a usable
+        # sidecar start empty
+        validator = cls()
+        state = _read_sidecar(stages_path)
+        if state is not None:
+            try:
+                digests, errors = list(state['digests']), list(state['errors'])
+                seen_stages = {(user_name, ss) for user_name, ss in state['seen_stages']}
+                drivers = {(user_name, real_name) for user_name, real_name in state['drivers']}
+            except (KeyError, TypeError, ValueError):
+                pass
+            else:
+                validator._stage_digests, validator._stage_errors = digests, errors
+                validator._seen_stages, validator._stage_drivers = seen_stages, drivers
+        state = _read_sidecar(final_path)
+        if state is not None:
+            try:
+                digests, errors = list(state['digests']), list(state['errors'])
+                seen_ranks, seen_users = set(state['seen_ranks']), set(state['seen_users'])
+                drivers = {(user_name, real_name) for user_name, real_name in state['drivers']}
+            except (KeyError, TypeError, ValueError):
+                pass
+            else:
+                validator._final_digests, validator._final_errors = digests, errors
+                validator._seen_ranks, validator._seen_users, validator._final_drivers = seen_ranks, seen_users, drivers
+        return validator
+
+    def save(self, stages_path, final_path):
+        _write_sidecar(stages_path, {
+            'digests': self._stage_digests,
+            'errors': self._stage_errors,
+            'seen_stages': sorted(self._seen_stages, key=repr),
+            'drivers': sorted(self._stage_drivers),
+        })
+        _write_sidecar(final_path, {
+            'digests': self._final_digests,
+            'errors': self._final_errors,
+            'seen_ranks': sorted(self._seen_ranks),
+            'seen_users': sorted(self._seen_users),
+            'drivers': sorted(self._final_drivers),
+        })
+
+    def validate(self, stages_data, final_data):
+        stages_data = list(stages_data)
+        final_data = list(final_data)
+
+        digests = _row_digests(stages_data)
+        known = len(self._stage_digests)
+        stages_full_pass = digests[:known] != self._stage_digests
+        if stages_full_pass:
+            self._reset_stages()
+            known = 0
+        self._stage_errors.extend(_check_stage_rows(stages_data, known, self._seen_stages))
+        self._stage_drivers.update(_drivers(stages_data[known:]))
+        self._stage_digests = digests
+        stage_rows = range(known + 2, len(stages_data) + 2)
+
+        digests = _row_digests(final_data)
+        known = len(self._final_digests)
+        final_full_pass = digests[:known] != self._final_digests
+        if final_full_pass:
+            self._reset_final()
+            known = 0
+        self._final_errors.extend(_check_final_rows(final_data, known, self._seen_ranks, self._seen_users))
+        self._final_drivers.update(_drivers(final_data[known:]))
+        self._final_digests = digests
+        final_rows = range(known + 2, len(final_data) + 2)
+
+        errors = self._stage_errors + self._final_errors + _rank_gaps(self._seen_ranks) + _cross_errors(self._stage_drivers, self._final_drivers)
+        return IncrementalResult(errors, stage_rows, final_rows, stages_full_pass, final_full_pass)
+
+# --- Report generation ---
+
+# kind is 'stage', 'final' or 'closing'; ss is the stage number of stage sections
+ReportSection = collections.namedtuple('ReportSection', 'kind ss title paragraphs')
+Report = collections.namedtuple('Report', 'sections text')
+
+REPORT_STYLES = ('Sporty',)
+
+def _stage_sort_key(result):
+    return result.seconds if result.seconds is not None else float('inf')
+
+class ResultIndex:
+    # Built once per rally: stage results grouped by SS and sorted by time, and every driver
+    # in the order the report balances mentions (final standings first, then stage-only drivers)
+    def __init__(self, stages_data, final_data):
+        self.stages = {}
+        self.drivers = {}
+        for driver_final in final_data:
+            self.drivers[driver_final.user_name] = []
+        for row in stages_data:
+            self.stages.setdefault(row.ss, []).append(row)
+            self.drivers.setdefault(row.user_name, []).append(row)
+        for ss_num, stage_results in self.stages.items():
+            stage_results.sort(key=_stage_sort_key)
+        self.final = sorted(final_data, key=lambda x: x.rank)
+
+def generate_report(stages_data, final_data, style="Sporty"):
+    # stages_data/final_data: validated StageResult/FinalResult records.
+    # Returns Report(sections, text); text is what gets posted to Discord.
+    sections = list(iter_report_sections(stages_data, final_data, style))
+    return Report(sections, format_report(sections))
+
+def iter_report_sections(stages_data, final_data, style="Sporty"):
+    # Yields each ReportSection as soon as it is written: the stages in order, then the final
+    # standings (which need every stage's driver mentions) and the closing words
+    if style not in REPORT_STYLES:
+        raise ValueError(f"Unknown report style '{style}'. Expected one of: {', '.join(REPORT_STYLES)}.")
+    index = ResultIndex(stages_data, final_data)
+    driver_mentions = dict.fromkeys(index.drivers, 0) # To track mentions for each driver
+
+    # Generate report for each stage
+    for ss_num in sorted(index.stages):
+        stage_results_sorted = index.stages[ss_num]
+        stage_name = stage_results_sorted[0].stage_name
+        stage_report_lines = []
+
+        # Identify stage winner
+        winner = None
+        for driver_result in stage_results_sorted:
+            if driver_result.finished and driver_result.time3:
+                winner = driver_result
+                break
+
+        if winner:
+            winner_name = normalize_name_casing(winner.user_name)
+            winner_time = format_seconds_to_mmss(winner.seconds)
+            stage_report_lines.append(f"Die **Etappe {ss_num}** auf **{stage_name}** startete mit einem Adrenalinkick! **{winner_name}** zeigte eine Meisterleistung und sicherte sich mit einer phänomenalen Zeit von **{winner_time}** den Etappensieg!")
+            driver_mentions[winner_name] += 1
+
+        # Identify duels and close finishes
+        for driver1, driver2 in zip(stage_results_sorted, stage_results_sorted[1:]):
+            if driver1.seconds is not None and driver2.seconds is not None:
+                diff = abs(driver1.seconds - driver2.seconds)
+                if diff < 5.0: # Example threshold for a close duel (5 seconds)
+                    driver1_name = normalize_name_casing(driver1.user_name)
+                    driver2_name = normalize_name_casing(driver2.user_name)
+                    stage_report_lines.append(f"Ein packendes Duell entbrannte zwischen **{driver1_name}** und **{driver2_name}**! Sie lieferten sich einen Kampf auf Messers Schneide, getrennt durch hauchdünne **{format_seconds_to_mmss(diff)}** Sekunden!")
+                    driver_mentions[driver1_name] += 1
+                    driver_mentions[driver2_name] += 1
+
+        # Identify retirements and comments
+        for driver_result in stage_results_sorted:
+            user_name = normalize_name_casing(driver_result.user_name)
+
+            if driver_result.progress == '': # Driver retired
+                retirement_reason = ""
+                if not driver_result.time1:
+                    retirement_reason = "bereits vor dem ersten Zwischenzeitpunkt"
+                elif not driver_result.time2:
+                    retirement_reason = "zwischen dem ersten und zweiten Zwischenzeitpunkt"
+                elif not driver_result.time3:
+                    retirement_reason = "im letzten Drittel der Etappe"
+
+                comment_insight = ""
+                if driver_result.comment:
+                    comment_insight = f" Ihr Kommentar: *'{driver_result.comment.strip()}'* sprach Bände über die Herausforderung."
+
+                stage_report_lines.append(f"Ein bitteres Aus für **{user_name}**! Der Fahrer musste {retirement_reason} auf dieser gnadenlosen Etappe aufgeben.{comment_insight}")
+                driver_mentions[user_name] += 1
+
+            # Penalties
+            if driver_result.penalty_seconds is not None and driver_result.penalty_seconds > 0:
+                stage_report_lines.append(f"Ein herber Dämpfer für **{user_name}**, der eine **{driver_result.penalty}**-Sekunden-Strafe kassierte! Jeder Wimpernschlag zählt in dieser Rallye!")
+                driver_mentions[user_name] += 1
+
+        # Add general commentary to reach 8-10 sentences (the heading counts as one)
+        while len(stage_report_lines) < 7:
+            stage_report_lines.append("Die Piloten meisterten das anspruchsvolle Terrain mit Bravour und trieben ihre Boliden bis an die Grenzen des Machbaren.")
+
+        yield ReportSection('stage', ss_num, f"## Etappe {ss_num}: {stage_name} 🏁", stage_report_lines)
+
+    # Final summary
+    final_lines = []
+    winner_final = index.final[0]
+    winner_name_final = normalize_name_casing(winner_final.user_name)
+    winner_time_final = format_seconds_to_mmss(winner_final.seconds)
+    final_lines.append(f"Nach einer kräftezehrenden Rallye steht der Champion fest! Ein riesiger Applaus für **{winner_name_final}**, der mit einer atemberaubenden Gesamtzeit von **{winner_time_final}** den Gesamtsieg einfuhr!")
+    driver_mentions[winner_name_final] += 1
+
+    # Mention top performers
+    if len(index.final) > 1:
+        second_place = index.final[1]
+        second_name = normalize_name_casing(second_place.user_name)
+        second_time = format_seconds_to_mmss(second_place.seconds)
+        final_lines.append(f"**{second_name}** zeigte eine beeindruckende Leistung und sicherte sich mit **{second_time}** einen verdienten zweiten Platz. Ihre Konstanz war bemerkenswert!")
+        driver_mentions[second_name] += 1
+
+    if len(index.final) > 2:
+        third_place = index.final[2]
+        third_name = normalize_name_casing(third_place.user_name)
+        third_time = format_seconds_to_mmss(third_place.seconds)
+        final_lines.append(f"Das Podium komplettiert **{third_name}**, der mit unglaublicher Zähigkeit und einer Zeit von **{third_time}** den dritten Rang eroberte. Eine starke Vorstellung!")
+        driver_mentions[third_name] += 1
+
+    # Check for drivers not mentioned twice and add general mentions
+    for driver, mentions in driver_mentions.items():
+        if mentions < 2:
+            final_lines.append(f"Auch **{driver}** trug mit seinem Einsatz und seiner Entschlossenheit maßgeblich zur Spannung dieser Rallye bei.")
+    yield ReportSection('final', None, "## Endstand der Rallye 🏆", final_lines)
+
+    yield ReportSection('closing', None, None, ["Diese Rallye war ein ultimativer Härtetest für Können, Ausdauer und Nerven. Von packenden Kopf-an-Kopf-Rennen bis zu dramatischen Ausfällen – sie lieferte Action pur und unvergessliche Momente. Herzlichen Glückwunsch an alle Teilnehmer für ihre herausragenden Leistungen! 🎉"])
+
+def format_report(sections):
+    # Discord layout: paragraphs separated by a blank line, with extra space after each
+    # stage and before the closing words
+    paragraphs = []
+    for section in sections:
+        paragraphs.extend(_layout_paragraphs(section))
+    return "\n\n".join(paragraphs)
+
+def _layout_paragraphs(section):
+    if section.title:
+        yield section.title
+    if section.kind == 'closing':
+        for paragraph in section.paragraphs:
+            yield "\n" + paragraph
+    else:
+        yield from section.paragraphs
+    if section.kind == 'stage':
+        yield "\n"
+
+# --- Discord messages ---
+
+DISCORD_MESSAGE_LIMIT = 2000
+
+# Text a message must never be split inside: bold names/times and quoted comments
+_UNBREAKABLE = re.compile(r"\*\*.+?\*\*|\*'.*?'\*")
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_WORD_GAP = re.compile(r'\s+')
+
+def iter_report_chunks(sections, limit=DISCORD_MESSAGE_LIMIT):
+    # Packs the report into messages of at most `limit` characters, laid out like
+    # format_report. Sections are consumed lazily, so with iter_report_sections the first
+    # message is ready while later stages are still being written. Messages break between
+    # paragraphs; a paragraph longer than a message breaks between sentences, a sentence
+    # longer than a message between words, never inside bold text.
+    chunk = ""
+    for section in sections:
+        for paragraph in _layout_paragraphs(section):
+            for piece in _split_paragraph(paragraph, limit):
+                candidate = f"{chunk}\n\n{piece}" if chunk else piece
+                if len(candidate.strip("\n")) <= limit:
+                    chunk = candidate
+                    continue
+                if chunk.strip("\n"):
+                    yield chunk.strip("\n")
+                chunk = piece
+    if chunk.strip("\n"):
+        yield chunk.strip("\n")
+
+def _split_paragraph(paragraph, limit):
+    if len(paragraph.strip("\n")) <= limit:
+        return [paragraph]
+    def split_sentence(sentence):
+        words = _split_outside_unbreakable(sentence, _WORD_GAP)
+        return _pack(words, limit, lambda word: [word[i:i + limit] for i in range(0, len(word), limit)])
+    return _pack(_split_outside_unbreakable(paragraph.strip("\n"), _SENTENCE_END), limit, split_sentence)
+
+def _split_outside_unbreakable(text, separator):
+    protected = [match.span() for match in _UNBREAKABLE.finditer(text)]
+    parts = []
+    start = 0
+    for match in separator.finditer(text):
+        if any(begin < match.start() < end for begin, end in protected):
+            continue
+        parts.append(text[start:match.start()])
+        start = match.end()
+    parts.append(text[start:])
+    return [part for part in parts if part]
+
+def _pack(parts, limit, split_oversized):
+    # Joins parts with single spaces into pieces of at most limit characters
+    pieces = []
+    current = ""
+    for part in parts:
+        if len(part) > limit:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.extend(split_oversized(part))
+        elif not current:
+            current = part
+        elif len(current) + 1 + len(part) <= limit:
+            current += " " + part
+        else:
+            pieces.append(current)
+            current = part
+    if current:
+        pieces.append(current)
+    return pieces
+
 import sys
 
 if __name__ == "__main__":
@@ -181,25 +739,28 @@ if __name__ == "__main__":
     final_file_path = "../../Downloads/DE-DCR-69-final.csv"
 
     try:
-        with open(stages_file_path, 'r', encoding='utf-8') as f:
-            stages_content = f.read()
-        with open(final_file_path, 'r', encoding='utf-8') as f:
-            final_content = f.read()
+        stages_data = load_stage_results(stages_file_path)
+        final_data = load_final_results(final_file_path)
     except FileNotFoundError as e:
         print(f"Error: File not found - {e.filename}")
         sys.exit(1)
     except Exception as e:
         print(f"Error reading files: {e}")
         sys.exit(1)
-    
-    stages_data = load_csv(stages_content)
-    final_data = load_csv(final_content)
 
-    stages_errors = validate_stages_data(stages_data)
-    final_errors = validate_final_data(final_data)
-    cross_errors = cross_validate_data(stages_data, final_data)
+    # Re-running after the next export only checks the rows appended since the last run
+    validator = IncrementalValidator.load(stages_file_path, final_file_path)
+    validation = validator.validate(stages_data, final_data)
+    validator.save(stages_file_path, final_file_path)
+    for label, rows, full_pass in (("Stages file", validation.stage_rows, validation.stages_full_pass),
+                                   ("Final file", validation.final_rows, validation.final_full_pass)):
+        if not rows:
+            print(f"{label}: no new rows.")
+        else:
+            scope = "earlier rows changed, full pass" if full_pass else ("all rows" if rows.start == 2 else "appended rows only")
+            print(f"{label}: checked rows {rows.start}-{rows.stop - 1} ({scope}).")
 
-    all_errors = stages_errors + final_errors + cross_errors
+    all_errors = validation.errors
 
     if all_errors:
         print("Data validation failed with the following errors:")
@@ -208,151 +769,14 @@ if __name__ == "__main__":
         sys.exit(1)
     else:
         print("Data validation successful. No errors found.")
-        
-        # Proceed with report generation
-        report_style = "Sporty" # User selected style
-
-        # Prepare data for report generation
-        stages_by_ss = {}
-        driver_overall_times = {} # To track total time for each driver
-        driver_mentions = {} # To track mentions for each driver
 
-        # Initialize driver_overall_times and driver_mentions from final_data
-        for driver_final in final_data:
-            user_name = driver_final['user_name']
-            driver_overall_times[user_name] = parse_time_to_seconds(driver_final['time3'])
-            driver_mentions[user_name] = 0
-
-        # Group stages data by SS and collect driver info
-        for row in stages_data:
-            ss_num = int(row['SS'])
-            if ss_num not in stages_by_ss:
-                stages_by_ss[ss_num] = []
-            stages_by_ss[ss_num].append(row)
-            
-            # Ensure all drivers from stages are in driver_mentions, even if they retired early
-            user_name = row['User name']
-            if user_name not in driver_mentions:
-                driver_mentions[user_name] = 0
-
-        # Sort stages by SS number
-        sorted_ss_nums = sorted(stages_by_ss.keys())
-
-        full_report = []
-
-        # Generate report for each stage
-        for ss_num in sorted_ss_nums:
-            stage_name = stages_by_ss[ss_num][0]['Stage name']
-            stage_results = stages_by_ss[ss_num]
-            
-            def sort_key(entry):
-                time3 = parse_time_to_seconds(entry.get('time3'))
-                return time3 if time3 is not None else float('inf')
-
-            stage_results_sorted = sorted(stage_results, key=sort_key)
-
-            stage_report_lines = []
-            stage_report_lines.append(f"## Etappe {ss_num}: {stage_name} 🏁")
-
-            # Identify stage winner
-            winner = None
-            for driver_result in stage_results_sorted:
-                if driver_result.get('Progress') == 'F' and driver_result.get('time3'):
-                    winner = driver_result
-                    break
-            
-            if winner:
-                winner_name = normalize_name_casing(winner['User name'])
-                winner_time = format_seconds_to_mmss(parse_time_to_seconds(winner['time3']))
-                stage_report_lines.append(f"Die **Etappe {ss_num}** auf **{stage_name}** startete mit einem Adrenalinkick! **{winner_name}** zeigte eine Meisterleistung und sicherte sich mit einer phänomenalen Zeit von **{winner_time}** den Etappensieg!")
-                driver_mentions[winner_name] += 1
-
-            # Identify duels and close finishes
-            for i in range(len(stage_results_sorted) - 1):
-                driver1 = stage_results_sorted[i]
-                driver2 = stage_results_sorted[i+1]
-
-                time1_s = parse_time_to_seconds(driver1.get('time3'))
-                time2_s = parse_time_to_seconds(driver2.get('time3'))
-
-                if time1_s is not None and time2_s is not None:
-                    diff = abs(time1_s - time2_s)
-                    if diff < 5.0: # Example threshold for a close duel (5 seconds)
-                        driver1_name = normalize_name_casing(driver1['User name'])
-                        driver2_name = normalize_name_casing(driver2['User name'])
-                        stage_report_lines.append(f"Ein packendes Duell entbrannte zwischen **{driver1_name}** und **{driver2_name}**! Sie lieferten sich einen Kampf auf Messers Schneide, getrennt durch hauchdünne **{format_seconds_to_mmss(diff)}** Sekunden!")
-                        driver_mentions[driver1_name] += 1
-                        driver_mentions[driver2_name] += 1
-            
-            # Identify retirements and comments
-            for driver_result in stage_results_sorted:
-                user_name = normalize_name_casing(driver_result['User name'])
-                progress = driver_result.get('Progress')
-                comment = driver_result.get('Comment')
-
-                if progress == '': # Driver retired
-                    retirement_reason = ""
-                    if not driver_result.get('time1'):
-                        retirement_reason = "bereits vor dem ersten Zwischenzeitpunkt"
-                    elif not driver_result.get('time2'):
-                        retirement_reason = "zwischen dem ersten und zweiten Zwischenzeitpunkt"
-                    elif not driver_result.get('time3'):
-                        retirement_reason = "im letzten Drittel der Etappe"
-                    
-                    comment_insight = ""
-                    if comment:
-                        comment_insight = f" Ihr Kommentar: *'{comment.strip()}'* sprach Bände über die Herausforderung."
-                    
-                    stage_report_lines.append(f"Ein bitteres Aus für **{user_name}**! Der Fahrer musste {retirement_reason} auf dieser gnadenlosen Etappe aufgeben.{comment_insight}")
-                    driver_mentions[user_name] += 1
-                
-                # Penalties
-                penalty = driver_result.get('Penalty')
-                if penalty and float(penalty) > 0:
-                    user_name = normalize_name_casing(driver_result['User name'])
-                    stage_report_lines.append(f"Ein herber Dämpfer für **{user_name}**, der eine **{penalty}**-Sekunden-Strafe kassierte! Jeder Wimpernschlag zählt in dieser Rallye!")
-                    driver_mentions[user_name] += 1
-
-            # Add general commentary to reach 8-10 sentences if needed
-            while len(stage_report_lines) < 8:
-                stage_report_lines.append("Die Piloten meisterten das anspruchsvolle Terrain mit Bravour und trieben ihre Boliden bis an die Grenzen des Machbaren.")
-            
-            full_report.extend(stage_report_lines)
-            full_report.append("\n") # Add a blank line between stages for Discord
-
-        # Final summary
-        full_report.append("## Endstand der Rallye 🏆")
-        
-        # Sort final data by rank
-        final_data_sorted = sorted(final_data, key=lambda x: int(x['#']))
-
-        winner_final = final_data_sorted[0]
-        winner_name_final = normalize_name_casing(winner_final['user_name'])
-        winner_time_final = format_seconds_to_mmss(parse_time_to_seconds(winner_final['time3']))
-        full_report.append(f"Nach einer kräftezehrenden Rallye steht der Champion fest! Ein riesiger Applaus für **{winner_name_final}**, der mit einer atemberaubenden Gesamtzeit von **{winner_time_final}** den Gesamtsieg einfuhr!")
-        driver_mentions[winner_name_final] += 1
-
-        # Mention top performers
-        if len(final_data_sorted) > 1:
-            second_place = final_data_sorted[1]
-            second_name = normalize_name_casing(second_place['user_name'])
-            second_time = format_seconds_to_mmss(parse_time_to_seconds(second_place['time3']))
-            full_report.append(f"**{second_name}** zeigte eine beeindruckende Leistung und sicherte sich mit **{second_time}** einen verdienten zweiten Platz. Ihre Konstanz war bemerkenswert!")
-            driver_mentions[second_name] += 1
-        
-        if len(final_data_sorted) > 2:
-            third_place = final_data_sorted[2]
-            third_name = normalize_name_casing(third_place['user_name'])
-            third_time = format_seconds_to_mmss(parse_time_to_seconds(third_place['time3']))
-            full_report.append(f"Das Podium komplettiert **{third_name}**, der mit unglaublicher Zähigkeit und einer Zeit von **{third_time}** den dritten Rang eroberte. Eine starke Vorstellung!")
-            driver_mentions[third_name] += 1
-
-        # Check for drivers not mentioned twice and add general mentions
-        for driver, mentions in driver_mentions.items():
-            if mentions < 2:
-                full_report.append(f"Auch **{driver}** trug mit seinem Einsatz und seiner Entschlossenheit maßgeblich zur Spannung dieser Rallye bei.")
-        
-        full_report.append("\nDiese Rallye war ein ultimativer Härtetest für Können, Ausdauer und Nerven. Von packenden Kopf-an-Kopf-Rennen bis zu dramatischen Ausfällen – sie lieferte Action pur und unvergessliche Momente. Herzlichen Glückwunsch an alle Teilnehmer für ihre herausragenden Leistungen! 🎉")
-
-        # Join with double newline for better Discord paragraph separation
-        print("\n\n".join(full_report))
+        report_style = "Sporty" # User selected style
+        if "--discord" in sys.argv[1:]:
+            # One Discord message per chunk, each printed as soon as it is complete
+            sections = iter_report_sections(stages_data, final_data, report_style)
+            for number, chunk in enumerate(iter_report_chunks(sections), start=1):
+                print(f"--- Message {number} ({len(chunk)} chars) ---")
+                print(chunk, flush=True)
+        else:
+            report = generate_report(stages_data, final_data, report_style)
+            print(report.text)
@@ -0,0 +1,263 @@
+import functools
+import io
+
+from poster_fonts import find_font_file
+
+# Draws the poster straight from poster_data with Pillow, no browser involved. The layout
+# follows POSTER_CSS in poster_generator: sizes are CSS pixels at 16px per em, on the
+# 1280px wide page Chromium renders, and everything is multiplied by the scale factor.
+
+LAYOUT_VERSION = 2 # Part of the render cache key; bump when the drawing changes
+
+# The layout needs FreeType fonts (size, getmetrics) even when no font file is found; before
+# 10.1 Pillow's last-resort font is a fixed-size bitmap without them
+MIN_PILLOW_VERSION = (10, 1)
+
+PAGE_WIDTH = 1280
+PAGE_MARGIN = 8 + 25 # Default body margin plus the body padding
+BASE_FONT_SIZE = 16
+LINE_HEIGHT = 1.2 # CSS 'normal'
+
+BACKGROUND = '#f4f1e8'
+TEXT_COLOR = '#333333'
+TITLE_COLOR = '#a00000'
+SUBTITLE_COLOR = '#444444'
+LEG_BACKGROUND = '#4d3d33'
+LEG_BORDER = '#111111'
+HEAD_BACKGROUND = '#777777'
+CELL_BORDER = '#777777'
+TABLE_BORDER = '#444444'
+SERVICE_BACKGROUND = '#dddddd'
+SERVICE_COLOR = '#222222'
+INFO_BACKGROUND = '#e9e5d9'
+INFO_BORDER = '#555555'
+
+# Face -> (bundled font, system fonts to try next); Pillow's own font is the last resort
+FONT_FILES = {
+    'regular': ('Roboto-Regular', ('arial.ttf', 'DejaVuSans.ttf', 'LiberationSans-Regular.ttf')),
+    'bold': ('Roboto-Bold', ('arialbd.ttf', 'DejaVuSans-Bold.ttf', 'LiberationSans-Bold.ttf')),
+    'italic': ('Roboto-Italic', ('ariali.ttf', 'DejaVuSans-Oblique.ttf', 'LiberationSans-Italic.ttf')),
+    'serif-bold': ('BodoniModa-Bold', ('georgiab.ttf', 'timesbd.ttf', 'DejaVuSerif-Bold.ttf', 'LiberationSerif-Bold.ttf')),
+    'display': ('Anton-Regular', ('impact.ttf', 'DejaVuSans-Bold.ttf', 'LiberationSans-Bold.ttf')),
+}
+
+
+def pillow_supported():
+    import PIL
+    try:
+        return tuple(int(part) for part in PIL.__version__.split('.')[:2]) >= MIN_PILLOW_VERSION
+    except ValueError:
+        return True # Unusual version string, e.g. a dev build
+
+
+@functools.lru_cache(maxsize=64)
+def load_font(face, size):
+    from PIL import ImageFont
+    bundled, system_fonts = FONT_FILES[face]
+    candidates = [find_font_file(bundled)[0]] + list(system_fonts)
+    for candidate in candidates:
+        if candidate is None:
+            continue
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue # Not installed, or a woff2 this FreeType can't read
+    return ImageFont.load_default(size) # Scalable only from Pillow 10.1, see MIN_PILLOW_VERSION
+
+
+class _Layout:
+    # Collects draw operations top to bottom, so the image can be created at its final height
+
+    def __init__(self, scale):
+        from PIL import Image, ImageDraw
+        self.scale = scale
+        self.width = round(PAGE_WIDTH * scale)
+        self.left = round(PAGE_MARGIN * scale)
+        self.right = self.width - self.left
+        self.y = self.left
+        self.operations = []
+        self._measure = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+        self._widths = {} # Surface, weather and service texts repeat on every leg
+
+    def text_width(self, text, font):
+        width = self._widths.get((text, font))
+        if width is None:
+            width = self._widths[(text, font)] = self._measure.textlength(text, font=font)
+        return width
+
+    def px(self, css_pixels):
+        return round(css_pixels * self.scale)
+
+    def font(self, face, em):
+        return load_font(face, max(1, round(em * BASE_FONT_SIZE * self.scale)))
+
+    def line_height(self, font):
+        return round(font.size * LINE_HEIGHT)
+
+    def wrap(self, text, font, width):
+        # Greedy word wrap; a single word wider than the line stays on a line of its own
+        text = ' '.join(text.split())
+        if self.text_width(text, font) <= width:
+            return [text]
+        lines = []
+        current = ""
+        for word in text.split():
+            candidate = f"{current} {word}" if current else word
+            if current and self.text_width(candidate, font) > width:
+                lines.append(current)
+                current = word
+            else:
+                current = candidate
+        lines.append(current)
+        return lines
+
+    def rectangle(self, box, fill=None, outline=None):
+        self.operations.append(('rectangle', box, fill, outline))
+
+    def text_lines(self, lines, font, color, left, right, top, align='left', line_height=None):
+        # Returns the height used
+        line_height = line_height or self.line_height(font)
+        ascent, descent = font.getmetrics()
+        offset = (line_height - ascent - descent) // 2
+        for number, line in enumerate(lines):
+            if align == 'center':
+                x = left + (right - left - self.text_width(line, font)) / 2
+            else:
+                x = left
+            self.operations.append(('text', (x, top + number * line_height + offset), line, font, color))
+        return line_height * len(lines)
+
+    def heading(self, text, font, color, margin_top, margin_bottom):
+        self.y += self.px(margin_top)
+        lines = self.wrap(text.upper(), font, self.right - self.left)
+        self.y += self.text_lines(lines, font, color, self.left, self.right, self.y, align='center')
+        self.y += self.px(margin_bottom)
+
+    def render(self):
+        from PIL import Image, ImageDraw
+        image = Image.new('RGB', (self.width, self.y + self.left), BACKGROUND)
+        draw = ImageDraw.Draw(image)
+        masks = {} # Rasterizing the glyphs costs far more than pasting a finished text again
+        for operation in self.operations:
+            if operation[0] == 'rectangle':
+                _, box, fill, outline = operation
+                draw.rectangle(box, fill=fill, outline=outline, width=max(1, self.px(1)))
+                continue
+            _, (x, y), text, font, color = operation
+            if not text:
+                continue
+            mask = masks.get((text, font))
+            if mask is None:
+                right, bottom = font.getbbox(text)[2:]
+                mask = masks[(text, font)] = Image.new('L', (max(1, int(right) + 1), max(1, int(bottom) + 1)))
+                ImageDraw.Draw(mask).text((0, 0), text, font=font, fill=255)
+            image.paste(color, (round(x), round(y), round(x) + mask.width, round(y) + mask.height), mask)
+        return image
+
+
+def draw_poster(poster_data, headers, info_lines=None, scale=1):
+    # headers: the table and distance labels (header_translations in poster_generator);
+    # info_lines: lines of the DE-DCR info box, drawn when given. Returns a PIL image.
+    layout = _Layout(scale)
+    layout.y += layout.px(0.67 * 48) # h1 default top margin
+    layout.heading(poster_data['rally_name'], layout.font('display', 3), TITLE_COLOR, 0, 10)
+
+    car_name = poster_data['car_name']
+    car_name_length = len(car_name.replace('<br>', ' '))
+    car_em = 1.2 if car_name_length > 150 else (1.4 if car_name_length > 80 else 1.7)
+    layout.heading(car_name, layout.font('serif-bold', car_em), SUBTITLE_COLOR, 5, 10)
+    layout.heading(f"{headers['distance_label']}: {poster_data['total_distance']}", layout.font('serif-bold', 1.5), SUBTITLE_COLOR, 0, 20)
+
+    for leg in poster_data['legs']:
+        _draw_leg(layout, leg, headers)
+
+    if info_lines:
+        _draw_info_box(layout, info_lines)
+    return layout.render()
+
+def render_poster_png(poster_data, headers, info_lines=None, scale=1):
+    image = draw_poster(poster_data, headers, info_lines, scale)
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', compress_level=1) # Speed over size; poster_image re-encodes when size matters
+    return buffer.getvalue()
+
+
+def _draw_leg(layout, leg, headers):
+    layout.y += layout.px(25)
+    font = layout.font('bold', 1.4)
+    padding = layout.px(8)
+    lines = layout.wrap(leg['name'].upper(), font, layout.right - layout.left - 2 * padding)
+    height = 2 * padding + layout.line_height(font) * len(lines)
+    layout.rectangle((layout.left, layout.y, layout.right - 1, layout.y + height - 1), fill=LEG_BACKGROUND, outline=LEG_BORDER)
+    layout.text_lines(lines, font, BACKGROUND, layout.left + padding, layout.right - padding, layout.y + padding, align='center')
+    layout.y += height
+    _draw_table(layout, leg['items'], headers)
+
+def _draw_table(layout, items, headers):
+    head_font = layout.font('bold', 0.95)
+    first_font = layout.font('bold', 0.95)
+    cell_font = layout.font('regular', 0.95)
+    service_font = layout.font('italic', 0.95)
+    pad_x, pad_y = layout.px(8), layout.px(6)
+
+    head = [headers['stage'].upper(), headers['length'].upper(), headers['surface'].upper(), headers['weather'].upper()]
+    stages = [[item['name'], item['length'], item['surface'], item['weather']] for item in items if item['type'] == 'stage']
+    widths = _column_widths(layout, head, head_font, stages, (first_font, cell_font, cell_font, cell_font), pad_x)
+    edges = [layout.left]
+    for width in widths:
+        edges.append(edges[-1] + width)
+    edges = [round(edge) for edge in edges[:-1]] + [layout.right]
+    table_top = layout.y
+
+    def row(cells, fonts, color, background=None):
+        wrapped = [layout.wrap(text, font, edges[i + 1] - edges[i] - 2 * pad_x) for i, (text, font) in enumerate(zip(cells, fonts))]
+        height = 2 * pad_y + max(layout.line_height(font) * len(lines) for lines, font in zip(wrapped, fonts))
+        for i, (lines, font) in enumerate(zip(wrapped, fonts)):
+            layout.rectangle((edges[i], layout.y, edges[i + 1] - 1, layout.y + height - 1), fill=background, outline=CELL_BORDER)
+            # Vertically centred like a table cell
+            text_height = layout.line_height(font) * len(lines)
+            layout.text_lines(lines, font, color, edges[i] + pad_x, edges[i + 1] - pad_x, layout.y + (height - text_height) // 2)
+        layout.y += height
+
+    row(head, (head_font,) * 4, BACKGROUND, HEAD_BACKGROUND)
+    for item in items:
+        if item['type'] == 'stage':
+            row([item['name'], item['length'], item['surface'], item['weather']], (first_font, cell_font, cell_font, cell_font), TEXT_COLOR)
+        elif item['type'] == 'service':
+            pad = layout.px(8)
+            lines = layout.wrap(item.get('cleaned_text', '').strip(), service_font, layout.right - layout.left - 2 * pad)
+            height = 2 * pad + layout.line_height(service_font) * len(lines)
+            layout.rectangle((layout.left, layout.y, layout.right - 1, layout.y + height - 1), fill=SERVICE_BACKGROUND, outline=CELL_BORDER)
+            layout.text_lines(lines, service_font, SERVICE_COLOR, layout.left + pad, layout.right - pad, layout.y + pad)
+            layout.y += height
+    layout.rectangle((layout.left, table_top, layout.right - 1, layout.y - 1), outline=TABLE_BORDER)
+
+def _column_widths(layout, head, head_font, rows, fonts, pad_x):
+    # Roughly the browser's automatic table layout: columns get their natural width plus a
+    # share of the spare room proportional to it; when the text doesn't fit, columns shrink
+    # towards their longest word
+    available = layout.right - layout.left
+    natural, minimum = [], []
+    for column, font in enumerate(fonts):
+        texts = [(head[column], head_font)] + [(cells[column], font) for cells in rows]
+        natural.append(max(layout.text_width(text, f) for text, f in texts) + 2 * pad_x)
+        minimum.append(max((layout.text_width(word, f) for text, f in texts for word in text.split()), default=0) + 2 * pad_x)
+    total = sum(natural)
+    if total <= available:
+        return [width * available / total for width in natural]
+    shrinkable = sum(n - m for n, m in zip(natural, minimum))
+    excess = total - available
+    if shrinkable <= 0:
+        return [width * available / total for width in natural]
+    return [n - (n - m) * min(1, excess / shrinkable) for n, m in zip(natural, minimum)]
+
+def _draw_info_box(layout, info_lines):
+    layout.y += layout.px(25)
+    font = layout.font('regular', 0.9)
+    padding = layout.px(15)
+    line_height = round(font.size * 1.5)
+    lines = [wrapped for line in info_lines for wrapped in layout.wrap(line, font, layout.right - layout.left - 2 * padding)]
+    height = 2 * padding + line_height * len(lines)
+    layout.rectangle((layout.left, layout.y, layout.right - 1, layout.y + height - 1), fill=INFO_BACKGROUND, outline=INFO_BORDER)
+    layout.text_lines(lines, font, SERVICE_COLOR, layout.left + padding, layout.right - padding, layout.y + padding, line_height=line_height)
+    layout.y += height
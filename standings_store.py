@@ -0,0 +1,185 @@
+import argparse
+import collections
+import datetime
+import os
+import sqlite3
+import sys
+import time
+
+from rally_data_processor import load_final_results, validate_final_data
+
+DEFAULT_DB_PATH = os.environ.get('RSF_STANDINGS_DB') or 'standings.sqlite'
+
+# DE-DCR scoring: winner 20, runner-up 18, ... 10th place 2 points
+POINTS_RANKS = 10
+
+Standing = collections.namedtuple('Standing', 'position user_name real_name points rallies wins best_rank')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rallies (
+    rally_id TEXT PRIMARY KEY,
+    held_at REAL NOT NULL,
+    ingested_at REAL NOT NULL,
+    drivers INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    rally_id TEXT NOT NULL REFERENCES rallies(rally_id),
+    user_name TEXT NOT NULL,
+    real_name TEXT,
+    rank INTEGER NOT NULL,
+    seconds REAL,
+    points INTEGER NOT NULL,
+    PRIMARY KEY (rally_id, user_name)
+);
+CREATE INDEX IF NOT EXISTS results_user ON results(user_name);
+-- Running totals, updated with every ingested rally so standings need no aggregation
+CREATE TABLE IF NOT EXISTS drivers (
+    user_name TEXT PRIMARY KEY,
+    real_name TEXT,
+    points INTEGER NOT NULL,
+    rallies INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    best_rank INTEGER NOT NULL
+);
+"""
+
+
+def points_for_rank(rank):
+    if 1 <= rank <= POINTS_RANKS:
+        return 20 - 2 * (rank - 1)
+    return 0
+
+
+class StandingsStore:
+    # Championship standings in a local SQLite file. Every rally's final results are
+    # ingested once; the per-driver totals are updated in the same transaction.
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def has_rally(self, rally_id):
+        row = self.connection.execute("SELECT 1 FROM rallies WHERE rally_id = ?", (rally_id,)).fetchone()
+        return row is not None
+
+    def ingest_rally(self, rally_id, final_data, held_at=None):
+        # final_data: validated FinalResult records. Returns False if the rally was ingested
+        # before, in which case nothing changes.
+        if held_at is None:
+            held_at = time.time()
+        rows = [(rally_id, result.user_name, result.real_name, result.rank, result.seconds, points_for_rank(result.rank))
+                for result in final_data]
+        with self.connection: # One transaction: the rally and its totals go in together or not at all
+            try:
+                self.connection.execute("INSERT INTO rallies (rally_id, held_at, ingested_at, drivers) VALUES (?, ?, ?, ?)",
+                                        (rally_id, held_at, time.time(), len(rows)))
+            except sqlite3.IntegrityError:
+                return False
+            self.connection.executemany("INSERT INTO results (rally_id, user_name, real_name, rank, seconds, points) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.connection.executemany("""
+                INSERT INTO drivers (user_name, real_name, points, rallies, wins, best_rank) VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT (user_name) DO UPDATE SET
+                    real_name = excluded.real_name,
+                    points = points + excluded.points,
+                    rallies = rallies + 1,
+                    wins = wins + excluded.wins,
+                    best_rank = MIN(best_rank, excluded.best_rank)
+            """, [(user_name, real_name, points, int(rank == 1), rank) for _, user_name, real_name, rank, _, points in rows])
+        return True
+
+    def ingest_final_csv(self, rally_id, source, held_at=None):
+        # source as for rally_data_processor.iter_csv. Raises ValueError listing the
+        # validation errors instead of storing a broken result file.
+        final_data = load_final_results(source)
+        errors = validate_final_data(final_data)
+        if errors:
+            raise ValueError("\n".join(errors))
+        return self.ingest_rally(rally_id, final_data, held_at)
+
+    def standings(self, limit=None, since=None):
+        # Without since the running totals are read directly. With since (a timestamp) only
+        # rallies held from then on count, summed from the stored results.
+        if since is None:
+            query = "SELECT user_name, real_name, points, rallies, wins, best_rank FROM drivers"
+            parameters = ()
+        else:
+            query = """
+                SELECT user_name, MAX(real_name), SUM(points), COUNT(*), SUM(rank = 1), MIN(rank)
+                FROM results JOIN rallies USING (rally_id)
+                WHERE held_at >= ?
+                GROUP BY user_name
+            """
+            parameters = (since,)
+        query += " ORDER BY 3 DESC, 5 DESC, 6 ASC, 1 ASC"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters += (limit,)
+        return [Standing(position, *row) for position, row in enumerate(self.connection.execute(query, parameters), start=1)]
+
+    def driver_results(self, user_name):
+        # (rally_id, rank, points) per rally, oldest first
+        return self.connection.execute("""
+            SELECT rally_id, rank, points FROM results JOIN rallies USING (rally_id)
+            WHERE user_name = ? ORDER BY held_at
+        """, (user_name,)).fetchall()
+
+    def rallies(self):
+        return [row[0] for row in self.connection.execute("SELECT rally_id FROM rallies ORDER BY held_at")]
+
+
+def parse_date(text):
+    # YYYY-MM-DD as a local-time timestamp, for the held_at of a rally
+    try:
+        return datetime.datetime.strptime(text, "%Y-%m-%d").timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{text}', expected YYYY-MM-DD") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Championship standings from DE-DCR final result files.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"SQLite file (default: {DEFAULT_DB_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Add a rally's final results")
+    ingest.add_argument("rally_id", help="Rally name, e.g. DE-DCR-69")
+    ingest.add_argument("final_csv", help="Final results CSV")
+    ingest.add_argument("--held-at", type=parse_date, metavar="DATE", help="Date the rally was held, YYYY-MM-DD (default: now)")
+    show = commands.add_parser("show", help="Print the standings")
+    show.add_argument("-n", "--limit", type=int, help="Only the first N drivers")
+    show.add_argument("--days", type=float, help="Only rallies held in the last N days (see ingest --held-at)")
+    args = parser.parse_args(argv)
+
+    with StandingsStore(args.db) as store:
+        if args.command == "ingest":
+            try:
+                ingested = store.ingest_final_csv(args.rally_id, args.final_csv, args.held_at)
+            except FileNotFoundError as e:
+                print(f"Error: File not found - {e.filename}")
+                return 1
+            except ValueError as e:
+                print("Data validation failed with the following errors:")
+                for error in str(e).splitlines():
+                    print(f"- {error}")
+                return 1
+            print(f"{args.rally_id}: ingested." if ingested else f"{args.rally_id}: already ingested, nothing changed.")
+            return 0
+
+        since = time.time() - args.days * 86400 if args.days is not None else None
+        for standing in store.standings(limit=args.limit, since=since):
+            print(f"{standing.position:>3}. {standing.user_name:<24} {standing.points:>4} pts  "
+                  f"({standing.rallies} rallies, {standing.wins} wins, best {standing.best_rank})")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())